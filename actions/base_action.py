@@ -1,10 +1,22 @@
-
+from typing import Dict
+from utils.tracing import traced
+from utils.waits import LatencyBudget
 
 
 class BaseAction:
 
-    def __init__(self, manager):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every action's execute() shows up as one span, whichever subclass implements it
+        if "execute" in cls.__dict__:
+            cls.execute = traced(f"action.{cls.__name__}", "action")(cls.__dict__["execute"])
+
+    def __init__(self, manager, budget: LatencyBudget = None, locators: Dict[str, str] = None):
         self.manager = manager
+        self.budget = budget or LatencyBudget()
+        # element name -> resource-id; seeded from a replay, updated with whatever the action discovers
+        self.locators: Dict[str, str] = dict(locators or {})
 
     def execute(self, **kwargs):
+        """Perform the action; returning False (rather than raising) marks the step as failed."""
         raise NotImplementedError("Subclasses must implement the execute method.")
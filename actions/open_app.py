@@ -1,5 +1,9 @@
 from actions.base_action import BaseAction
 from components import highlight_message
+from utils.waits import mark_unsettled, wait_until
+
+# ApplicationState.RUNNING_IN_FOREGROUND as reported by queryAppState
+APP_STATE_FOREGROUND = 4
 
 
 class OpenAppAction(BaseAction):
@@ -21,3 +25,12 @@ class OpenAppAction(BaseAction):
         else:
             raise AttributeError("The driver does not support app launching methods.")
 
+        # Return once the app is in the foreground; later steps wait for their own elements, and a
+        # screenshot waits for the screen to settle
+        driver, package = self.manager.driver, self.manager.app_package
+        if hasattr(driver, "query_app_state"):
+            wait_until(lambda: driver.query_app_state(package) == APP_STATE_FOREGROUND, self.budget.clamp(10),
+                       f"{package} did not come to the foreground")
+
+        mark_unsettled(driver)
+
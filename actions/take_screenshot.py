@@ -1,6 +1,9 @@
 import os
-import datetime
 from components import highlight_message
+from utils.config import Config
+from utils.screen_capture import capture
+from utils.screenshots import ScreenshotPipeline
+from utils.waits import settle_screen
 from .base_action import BaseAction
 
 
@@ -12,13 +15,17 @@ class TakeScreenshotAction(BaseAction):
         try:
             if not output_path:
                 output_path = os.path.join(os.getcwd(), "screenshots", self.manager.app_package)
-                os.makedirs(output_path, exist_ok=True)
-
-            SCREENSHOT_PATH = f"{output_path}/{datetime.datetime.now()}.png"
 
             highlight_message("📸 Taking screenshot...")
-            self.manager.driver.save_screenshot(SCREENSHOT_PATH)
-            print(f"💾 Screenshot saved to {SCREENSHOT_PATH}\n")
+            # Capture the screen an earlier step led to, not a frame mid-transition
+            settle_screen(self.manager.driver, self.budget.clamp(Config.WAIT_SETTLE_TIMEOUT))
+            frame = capture(self.manager.driver, self.manager.device_id, kwargs.get("backend"))
+
+            # Encoding and the disk write happen in the background; the next step can start right away
+            ScreenshotPipeline.default().submit(frame.data, output_path,
+                                                prefix=f"{self.manager.app_package}-{self.manager.device_id}",
+                                                raw=frame.raw, device_id=self.manager.device_id)
+            print(f"💾 Screenshot queued for {output_path}\n")
 
             return True
 
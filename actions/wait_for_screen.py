@@ -1,13 +1,16 @@
-from selenium.webdriver.support.wait import WebDriverWait
 from actions.base_action import BaseAction
+from utils.waits import ConditionBatch
 
 
 class WaitForScreenAction(BaseAction):
 
     def execute(self, **kwargs):
-        timeout = kwargs.get("timeout", 5)
-        element_id = kwargs.get("element_id", "search_box")
+        timeout = self.budget.clamp(float(kwargs.get("timeout", 5)))
+        element_ids = kwargs.get("element_ids") or [kwargs.get("element_id", "search_box")]
 
-        WebDriverWait(self.manager.driver, timeout).until(
-            lambda driver: driver.find_element_by_id(element_id)
-        )
\ No newline at end of file
+        # Every element is checked against the same UI dump on each poll
+        batch = ConditionBatch(self.manager.driver)
+        for element_id in element_ids:
+            batch.add(element_id, lambda snapshot, element_id=element_id: snapshot.find(resource_id=element_id))
+
+        return batch.wait(timeout, require_all=kwargs.get("require_all", True))
@@ -0,0 +1,65 @@
+"""Capture latency and frame size of each screenshot backend on a connected device.
+
+    python -m benchmarks.bench_screenshot [--device SERIAL] [--backends webdriver screencap screencap-raw] [--repeat 10]
+
+Needs a device and, for the webdriver backend, a running Appium server (Config.DRIVER_URL). The encode
+column is the background pipeline's cost to turn the frame into a PNG file, which the step no longer waits on.
+"""
+import argparse
+import statistics
+import tempfile
+import time
+from device_manager.connected_devices import get_all_devices_info
+from utils.driver_factory import DriverFactory
+from utils.screen_capture import BACKENDS
+from utils.screenshots import ScreenshotPipeline
+
+
+def measure(backend, driver, device_id, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        frame = BACKENDS[backend](driver, device_id)
+        timings.append(time.perf_counter() - started)
+
+    pipeline = ScreenshotPipeline(workers=1, dedupe=False)
+    with tempfile.TemporaryDirectory() as directory:
+        started = time.perf_counter()
+        pipeline.submit(frame.data, directory, backend, raw=frame.raw).result()
+        encode = time.perf_counter() - started
+
+    pipeline.close()
+    return timings, len(frame.data), encode
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--device", help="serial of the device to use, defaults to the first connected one")
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    devices = get_all_devices_info() or []
+    device = next((d for d in devices if d.device_id == args.device), None) if args.device else (devices or [None])[0]
+    if device is None:
+        raise SystemExit("No matching device connected.")
+
+    driver = None
+    if "webdriver" in args.backends:
+        driver = DriverFactory.create_driver(device.device_id, "com.android.settings", ".Settings", device.platform_version)
+
+    try:
+        print(f"{device.device_name} ({device.device_id}), {args.repeat} captures per backend")
+        print(f"{'backend':<14} {'best ms':>9} {'median ms':>10} {'frame MB':>9} {'encode ms':>10}")
+        for backend in args.backends:
+            timings, size, encode = measure(backend, driver, device.device_id, args.repeat)
+            print(f"{backend:<14} {min(timings) * 1000:>9.1f} {statistics.median(timings) * 1000:>10.1f} "
+                  f"{size / 1e6:>9.2f} {encode * 1000:>10.1f}")
+
+    finally:
+        if driver is not None:
+            driver.quit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Import time of the package entry points, checked against a budget.
+
+    python -m benchmarks.bench_startup [--repeat 5] [--scale 1.0] [--only runner.cli llm.parser]
+
+Each entry point is imported in a fresh interpreter under `python -X importtime`; the median
+cumulative time is compared with its budget, and the import must not pull in any of the listed
+heavy modules. Exits with status 1 when any entry point is over budget or loads a forbidden module,
+so it can run in CI. --scale multiplies every budget for slower machines.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# entry point -> (budget in ms, modules it must not import). Budgets are total import time, stdlib
+# included: dataclasses/inspect/re alone cost ~25 ms on a slow CI runner, and talking to adb needs asyncio.
+# The forbidden lists catch eager imports (asyncio, sqlite3, http, concurrent.futures -> logging)
+# whatever the machine's speed.
+BUDGETS = {
+    "runner.cli": (40, ["streamlit", "openai", "appium", "selenium", "asyncio", "sqlite3", "http", "concurrent"]),
+    "device_manager.connected_devices": (140, ["streamlit", "openai", "appium", "selenium", "sqlite3", "http"]),
+    "llm.function_calling": (55, ["selenium", "appium", "asyncio", "sqlite3", "http"]),
+    "llm.parser": (90, ["openai", "httpx", "dotenv", "selenium", "appium", "asyncio", "sqlite3", "http"]),
+    "llm.planner": (110, ["openai", "httpx", "selenium", "appium", "asyncio", "sqlite3", "http", "concurrent"]),
+    "runner.executor": (300, ["streamlit", "openai"]),
+    "main": (600, ["openai"]),
+}
+
+
+def import_profile(module: str):
+    """Cumulative import time of `module` in microseconds and the top-level names of everything it loaded."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    cumulative, loaded = None, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+
+        _, total, name = line.split("|")
+        name = name.strip()
+        loaded.add(name.split(".")[0])
+        if name == module:
+            cumulative = int(total)
+
+    return cumulative, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--only", nargs="+", choices=list(BUDGETS))
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'entry point':<34} {'median ms':>10} {'budget ms':>10}  status")
+    for module in args.only or BUDGETS:
+        budget, forbidden = BUDGETS[module]
+        budget *= args.scale
+
+        timings, loaded = [], set()
+        for _ in range(args.repeat):
+            cumulative, loaded = import_profile(module)
+            timings.append(cumulative / 1000)
+
+        median = statistics.median(timings)
+        leaked = sorted(name for name in forbidden if name in loaded)
+
+        status = "ok"
+        if median > budget:
+            status = "OVER BUDGET"
+        if leaked:
+            status = f"imports {', '.join(leaked)}" if status == "ok" else f"{status}; imports {', '.join(leaked)}"
+        if status != "ok":
+            failures.append(module)
+
+        print(f"{module:<34} {median:>10.1f} {budget:>10.0f}  {status}")
+
+    if failures:
+        print(f"\nStartup regressions in: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Latency and peak memory of search bar identification on large synthetic UI dumps.
+
+    python -m benchmarks.bench_ui_parse [--products 500 2000 10000] [--repeat 5] [--without-search-bar]
+
+--without-search-bar measures the worst case, where streaming has to read the whole dump.
+"""
+import argparse
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from benchmarks.ui_dumps import product_listing
+from components.nav_bar.search_bar import SearchBarComponent
+from components.ui_index import UISnapshot
+
+
+def dom_recursive(xml_content):
+    """The original approach: full ElementTree parse, then a recursive walk over every node."""
+    root = ET.fromstring(xml_content)
+    results = []
+
+    def visit(node, parent_path=""):
+        attrs = node.attrib
+        path = f"{parent_path}/{node.tag}"
+        enabled = attrs.get("enabled", "false").lower() == "true"
+        for key in ("resource-id", "text", "class"):
+            if "search" in attrs.get(key, "").lower() and enabled:
+                results.append({"attributes": attrs, "path": path, "is_resource_match": key == "resource-id"})
+        for child in node:
+            visit(child, path)
+
+    visit(root)
+    results.sort(key=lambda x: not x["is_resource_match"])
+    return results
+
+
+def indexed(xml_content):
+    return SearchBarComponent.identify_search_bar_in(UISnapshot.from_xml(xml_content))
+
+
+def streamed(xml_content):
+    return SearchBarComponent.scan_search_bar(xml_content)[1]
+
+
+STRATEGIES = [("dom + recursive walk", dom_recursive), ("snapshot index", indexed), ("stream + early exit", streamed)]
+
+
+def measure(function, xml_content, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function(xml_content)
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    function(xml_content)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return min(timings), peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--products", type=int, nargs="+", default=[500, 2000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--without-search-bar", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'products':>8} {'dump MB':>8}  {'strategy':<22} {'best ms':>9} {'peak MB':>8}  first match")
+    for products in args.products:
+        xml_content = product_listing(products, search_bar=not args.without_search_bar)
+        size = len(xml_content.encode("utf-8")) / 1e6
+
+        for name, function in STRATEGIES:
+            seconds, peak, result = measure(function, xml_content, args.repeat)
+            first = result[0]["attributes"].get("resource-id") if result else None
+            print(f"{products:>8} {size:>8.2f}  {name:<22} {seconds * 1000:>9.2f} {peak / 1e6:>8.2f}  {first}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+"""Stand-ins for a device, Appium and the LLM endpoint, so whole runs can be benchmarked offline.
+
+FakeDriver replays recorded page sources (benchmarks/fixtures/*.xml) and moves between screens the
+way the search flow does: clicking the search box focuses it and pressing ENTER shows the results.
+FakeLLMServer answers the OpenAI completions and chat completions routes on localhost.
+"""
+import json
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from selenium.common import NoSuchElementException
+from selenium.webdriver.common.by import By
+from components.ui_index import UISnapshot
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, f"{name}.xml"), encoding="utf-8") as file:
+        return file.read()
+
+
+def load_screenshot(name: str) -> bytes:
+    """A recorded PNG when there is one, otherwise a small generated frame."""
+    path = os.path.join(FIXTURES_DIR, f"{name}.png")
+    if os.path.exists(path):
+        with open(path, "rb") as file:
+            return file.read()
+
+    return solid_png(270, 600)
+
+
+def solid_png(width: int, height: int, rgb=(245, 245, 245)) -> bytes:
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    rows = b"".join(b"\x00" + bytes(rgb) * width for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+class FakeElement:
+
+    def __init__(self, driver: "FakeDriver", attributes: Dict[str, str]):
+        self.driver = driver
+        self.attributes = attributes
+
+    @property
+    def id(self):
+        return self.attributes.get("resource-id", "")
+
+    def is_displayed(self) -> bool:
+        return self.attributes.get("displayed", "true") == "true"
+
+    def is_enabled(self) -> bool:
+        return self.attributes.get("enabled", "true") == "true"
+
+    def click(self):
+        self.driver.execute("clickElement", {"id": self.id})
+
+    def send_keys(self, *value):
+        self.driver.execute("sendKeysToElement", {"id": self.id, "text": "".join(value)})
+
+
+class FakeDriver:
+    """Replays `screens` (name -> page source XML), starting at `start`.
+
+    `latency` maps driver commands to simulated round-trip seconds; "default" applies to the rest.
+    """
+
+    XPATH_TEXT_CONTAINS = re.compile(r"//\*\[contains\(@text, '([^']*)'\)\]")
+
+    def __init__(self, screens: Dict[str, str] = None, start: str = "home", latency: Dict[str, float] = None,
+                 screenshot: bytes = None):
+        self.screens = screens or {"home": load_fixture("home"), "results": load_fixture("results")}
+        self.screen = start
+        self.latency = latency or {}
+        self.screenshot = screenshot or load_screenshot(start)
+        self.session_id = "fake-session"
+        self.current_package = "com.example.shop"
+        self.commands = 0
+        self._snapshots: Dict[str, UISnapshot] = {}
+        self._focused: Optional[str] = None
+
+    def execute(self, driver_command: str, params: dict = None):
+        self.commands += 1
+        delay = self.latency.get(driver_command, self.latency.get("default", 0.0))
+        if delay:
+            time.sleep(delay)
+
+        handler = getattr(self, f"_command_{driver_command}", None)
+        return {"value": handler(params or {}) if handler else None}
+
+    def _snapshot(self) -> UISnapshot:
+        if self.screen not in self._snapshots:
+            self._snapshots[self.screen] = UISnapshot.from_xml(self.screens[self.screen])
+
+        return self._snapshots[self.screen]
+
+    # WebDriver surface used by the actions
+
+    @property
+    def page_source(self) -> str:
+        return self.execute("getPageSource")["value"]
+
+    def find_element(self, by=By.ID, value=None):
+        return self.execute("findElement", {"using": by, "value": value})["value"]
+
+    def get_screenshot_as_png(self) -> bytes:
+        return self.execute("screenshot")["value"]
+
+    def activate_app(self, app_package: str):
+        self.execute("activateApp", {"appId": app_package})
+
+    def terminate_app(self, app_package: str) -> bool:
+        return self.execute("terminateApp", {"appId": app_package})["value"]
+
+    def query_app_state(self, app_package: str) -> int:
+        return self.execute("queryAppState", {"appId": app_package})["value"]
+
+    def quit(self):
+        self.execute("quit")
+
+    # Command handlers
+
+    def _command_getPageSource(self, params):
+        return self.screens[self.screen]
+
+    def _command_screenshot(self, params):
+        return self.screenshot
+
+    def _command_findElement(self, params):
+        snapshot, value = self._snapshot(), params["value"]
+
+        if params["using"] == By.ID:
+            matches = snapshot.find(resource_id=value)
+        else:
+            text = self.XPATH_TEXT_CONTAINS.fullmatch(value or "")
+            matches = snapshot.find(text_contains=text.group(1)) if text else []
+
+        if not matches:
+            raise NoSuchElementException(f"{params['using']}={value} not on screen '{self.screen}'")
+
+        return FakeElement(self, snapshot.attributes[matches[0]])
+
+    def _command_clickElement(self, params):
+        if "search" in params["id"]:
+            self._focused = params["id"]
+
+    def _command_actions(self, params):
+        # ENTER in a focused search box submits the search
+        if self._focused and "results" in self.screens:
+            self.screen, self._focused = "results", None
+
+    def _command_activateApp(self, params):
+        self.screen = "home"
+
+    def _command_queryAppState(self, params):
+        return 4
+
+    def _command_terminateApp(self, params):
+        return True
+
+
+class FakeLLMServer:
+    """OpenAI-compatible endpoint on localhost answering from a keyword table, with optional latency."""
+
+    KEYWORDS = [("search", "search"), ("look up", "search"), ("screenshot", "take_screenshot"), ("wait", "wait_for_screen")]
+    SEARCH_TERM = re.compile(r"(?:search(?: for)?|look up|find)\s+(.+?)(?:\s+(?:with|using|in|on)\b.*)?$", re.IGNORECASE)
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+
+                payload = server.respond(self.path, body)
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    @classmethod
+    def interpret(cls, instruction: str):
+        lowered = instruction.lower()
+        name = next((action for keyword, action in cls.KEYWORDS if keyword in lowered), "open_app")
+        arguments = {}
+        if name == "search":
+            term = cls.SEARCH_TERM.search(instruction)
+            arguments["search_term"] = term.group(1) if term else instruction
+
+        return name, arguments
+
+    def respond(self, path: str, body: dict) -> dict:
+        common = {"id": "fake", "created": int(time.time()), "model": body.get("model") or "fake"}
+
+        if path.endswith("/chat/completions"):
+            name, arguments = self.interpret(body["messages"][-1]["content"])
+            message = {
+                "role": "assistant", "content": None,
+                "tool_calls": [{"id": "call_0", "type": "function",
+                                "function": {"name": name, "arguments": json.dumps(arguments)}}],
+            }
+            return {**common, "object": "chat.completion",
+                    "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls"}]}
+
+        instruction = re.search(r"Instruction: (.*)", body.get("prompt", ""))
+        name, arguments = self.interpret(instruction.group(1) if instruction else "")
+        parameters = ", ".join(f"{key}={value}" for key, value in arguments.items())
+        return {**common, "object": "text_completion",
+                "choices": [{"index": 0, "text": f"Action: {name}\nParameters: {parameters}",
+                             "finish_reason": "stop", "logprobs": None}]}
+
+
+@contextmanager
+def fake_environment(llm_latency: float = 0.0, driver_latency: Dict[str, float] = None):
+    """Route LLM calls to a FakeLLMServer and every new session to a FakeDriver for the duration."""
+    import runner.session
+    import utils.appium_manager
+    from llm.parser import LLMAutomation
+    from utils.config import Config
+    from utils.tracing import instrument_driver
+
+    server = FakeLLMServer(latency=llm_latency).start()
+    saved = {
+        "base_url": LLMAutomation.__dict__["base_url"], "api_key": LLMAutomation.__dict__["api_key"],
+        "model": LLMAutomation.__dict__["model"], "pool": Config.SESSION_POOL_ENABLED,
+        "cache": Config.LLM_CACHE_ENABLED, "locators": Config.LOCATOR_STORE_ENABLED,
+        "factory": utils.appium_manager.DriverFactory, "version": utils.appium_manager.resolve_app_version,
+        "find_app": runner.session.find_app_by_name, "activity": runner.session.resolve_launcher_activity,
+    }
+
+    class FakeDriverFactory:
+        @staticmethod
+        def create_driver(device_id, app_package, app_activity, platform_version, driver_url=None):
+            return instrument_driver(FakeDriver(latency=driver_latency))
+
+    LLMAutomation.base_url, LLMAutomation.api_key, LLMAutomation.model = server.base_url, "fake", "fake"
+    Config.SESSION_POOL_ENABLED = False
+    Config.LLM_CACHE_ENABLED = False
+    Config.LOCATOR_STORE_ENABLED = False
+    utils.appium_manager.DriverFactory = FakeDriverFactory
+    utils.appium_manager.resolve_app_version = lambda package_name, device_id: "1.0 (1)"
+    runner.session.find_app_by_name = lambda app_name, device_id: "com.example.shop"
+    runner.session.resolve_launcher_activity = lambda package_name, device_id: ".MainActivity"
+
+    try:
+        yield server
+    finally:
+        server.stop()
+        LLMAutomation.base_url, LLMAutomation.api_key, LLMAutomation.model = (
+            saved["base_url"], saved["api_key"], saved["model"])
+        Config.SESSION_POOL_ENABLED = saved["pool"]
+        Config.LLM_CACHE_ENABLED = saved["cache"]
+        Config.LOCATOR_STORE_ENABLED = saved["locators"]
+        utils.appium_manager.DriverFactory = saved["factory"]
+        utils.appium_manager.resolve_app_version = saved["version"]
+        runner.session.find_app_by_name = saved["find_app"]
+        runner.session.resolve_launcher_activity = saved["activity"]
@@ -0,0 +1,42 @@
+"""Record the current screen of a device as a benchmark fixture.
+
+    python -m benchmarks.record_fixture NAME --package com.example.shop [--activity .MainActivity] [--device SERIAL]
+
+Writes benchmarks/fixtures/NAME.xml (page source) and NAME.png (screenshot). FakeDriver replays
+"home" and "results" by default, so re-recording those two replaces the synthetic dumps.
+"""
+import argparse
+import os
+from benchmarks.fakes import FIXTURES_DIR
+from device_manager.connected_devices import get_all_devices_info
+from utils.driver_factory import DriverFactory
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("name")
+    parser.add_argument("--package", required=True)
+    parser.add_argument("--activity", default=".MainActivity")
+    parser.add_argument("--device", help="serial of the device to use, defaults to the first connected one")
+    args = parser.parse_args()
+
+    devices = get_all_devices_info() or []
+    device = next((d for d in devices if d.device_id == args.device), None) if args.device else (devices or [None])[0]
+    if device is None:
+        raise SystemExit("No matching device connected.")
+
+    driver = DriverFactory.create_driver(device.device_id, args.package, args.activity, device.platform_version)
+    try:
+        os.makedirs(FIXTURES_DIR, exist_ok=True)
+        with open(os.path.join(FIXTURES_DIR, f"{args.name}.xml"), "w", encoding="utf-8") as file:
+            file.write(driver.page_source)
+        with open(os.path.join(FIXTURES_DIR, f"{args.name}.png"), "wb") as file:
+            file.write(driver.get_screenshot_as_png())
+    finally:
+        driver.quit()
+
+    print(f"Recorded {args.name} from {device.device_name} ({device.device_id}) into {FIXTURES_DIR}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Offline benchmark suite: fixtures through a FakeDriver and a local fake LLM endpoint.
+
+    python -m benchmarks.run [--repeat 20] [--only search_bar.index ...] [--compare HEAD~1] [--threshold 0.2]
+
+Results are stored per commit in .cache/benchmarks/<commit>.json. --compare takes a commit (or a
+results file) measured earlier and reports the change of every case; with --fail-on-regression the
+exit status is 1 when any case got slower than --threshold (a fraction, 0.2 = 20%).
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+from benchmarks.fakes import FakeDriver, fake_environment, load_fixture
+from benchmarks.ui_dumps import product_listing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(ROOT, ".cache", "benchmarks")
+
+RUN_INSTRUCTIONS = ["Open the app", "Wait for the home screen to load", "Search for milk", "Take a screenshot"]
+
+
+class _Manager:
+    """Just enough of AppiumAppManager for an action to run against a FakeDriver."""
+
+    def __init__(self, driver, app_package: str = "com.example.shop"):
+        self.driver = driver
+        self.app_package = app_package
+        self.app_activity = ".MainActivity"
+        self.device_id = "fake-device"
+        self.app_version = "1.0 (1)"
+
+
+def case_search_bar_index() -> Callable[[], object]:
+    from components.nav_bar.search_bar import SearchBarComponent
+
+    xml_content = load_fixture("home")
+    return lambda: SearchBarComponent.identify_search_bar(xml_content)
+
+
+def case_search_bar_stream() -> Callable[[], object]:
+    from components.nav_bar.search_bar import SearchBarComponent
+
+    xml_content = load_fixture("home")
+    return lambda: SearchBarComponent.identify_search_bar(xml_content, early_exit=True)
+
+
+def case_search_bar_large() -> Callable[[], object]:
+    from components.nav_bar.search_bar import SearchBarComponent
+
+    xml_content = product_listing(2000)
+    return lambda: SearchBarComponent.identify_search_bar(xml_content)
+
+
+def case_search_action() -> Callable[[], object]:
+    from actions.search import SearchAction
+
+    def run():
+        action = SearchAction(_Manager(FakeDriver()))
+        action.search_box_finder.store = None  # always discover
+        action.execute(query="milk")
+
+    return run
+
+
+def case_search_action_stored() -> Callable[[], object]:
+    from actions.search import SearchAction
+    from components.locator_store import LocatorStore
+
+    store = LocatorStore(":memory:")
+
+    def run():
+        action = SearchAction(_Manager(FakeDriver()))
+        action.search_box_finder.store = store
+        action.execute(query="milk")
+
+    return run
+
+
+def case_local_parser() -> Callable[[], object]:
+    from llm.local_parser import LocalIntentParser
+
+    parser = LocalIntentParser.default()
+    return lambda: parser.parse("Add 2 packets of Amul butter to the cart")
+
+
+def case_llm_call(environment) -> Callable[[], object]:
+    from llm.parser import LLMAutomation
+
+    return lambda: LLMAutomation.call_llm("Look up basmati rice with the search bar", check_cache=False)
+
+
+def case_full_run(environment) -> Callable[[], object]:
+    from device_manager.connected_devices import DeviceInfo
+    from runner.executor import MultiDeviceExecutor
+
+    devices = [DeviceInfo(f"Fake {index}", "14", f"fake-{index}") for index in range(4)]
+    return lambda: MultiDeviceExecutor().run(devices, "Shop", RUN_INSTRUCTIONS)
+
+
+# name -> (factory, needs the fake LLM/driver environment)
+CASES: Dict[str, tuple] = {
+    "search_bar.index": (case_search_bar_index, False),
+    "search_bar.stream": (case_search_bar_stream, False),
+    "search_bar.index_2000_products": (case_search_bar_large, False),
+    "search_action.execute": (case_search_action, False),
+    "search_action.execute_stored": (case_search_action_stored, False),
+    "parser.local": (case_local_parser, False),
+    "parser.llm_call": (case_llm_call, True),
+    "run.4_devices": (case_full_run, True),
+}
+
+
+def measure(function: Callable[[], object], repeat: int) -> Dict[str, float]:
+    function()  # warm-up: imports, lazy indexes, connection setup
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+
+    timings.sort()
+    median = statistics.median(timings)
+    return {
+        "median_ms": round(median * 1000, 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000, 4),
+        "ops_per_s": round(1 / median, 2) if median else None,
+        "repeat": repeat,
+    }
+
+
+def current_commit() -> str:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                               capture_output=True, text=True).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def load_results(reference: str) -> dict:
+    path = reference if os.path.isfile(reference) else None
+    if path is None:
+        try:
+            commit = subprocess.run(["git", "rev-parse", "--short", reference], cwd=ROOT, capture_output=True,
+                                    text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = reference
+        path = os.path.join(RESULTS_DIR, f"{commit}.json")
+
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def run_cases(names, repeat: int, quiet: bool = True) -> Dict[str, dict]:
+    results = {}
+    plain = [name for name in names if not CASES[name][1]]
+    faked = [name for name in names if CASES[name][1]]
+
+    for name in plain:
+        results[name] = measure(CASES[name][0](), repeat)
+
+    if faked:
+        with fake_environment() as environment, tempfile.TemporaryDirectory() as scratch:
+            # Screenshots and traces from full runs land in a throwaway directory
+            previous = os.getcwd()
+            os.chdir(scratch)
+            try:
+                for name in faked:
+                    results[name] = measure(CASES[name][0](environment), repeat)
+            finally:
+                os.chdir(previous)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--only", nargs="+", choices=list(CASES))
+    parser.add_argument("--compare", help="commit or results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--no-save", action="store_true", help="do not store the results for this commit")
+    args = parser.parse_args()
+
+    names = args.only or list(CASES)
+    # The actions print progress; keep the report readable
+    with open(os.devnull, "w") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            results = run_cases(names, args.repeat)
+        finally:
+            sys.stdout = stdout
+
+    commit = current_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        with open(os.path.join(RESULTS_DIR, f"{commit}.json"), "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+    baseline = load_results(args.compare)["results"] if args.compare else {}
+    regressions = []
+
+    print(f"{'case':<32} {'median ms':>10} {'p95 ms':>10} {'ops/s':>10}  {'vs ' + args.compare if args.compare else ''}")
+    for name, result in results.items():
+        change = ""
+        before = baseline.get(name)
+        if before and before["median_ms"]:
+            delta = result["median_ms"] / before["median_ms"] - 1
+            change = f"{delta:+.1%}"
+            if delta > args.threshold:
+                change += "  REGRESSION"
+                regressions.append(name)
+
+        print(f"{name:<32} {result['median_ms']:>10.3f} {result['p95_ms']:>10.3f} {result['ops_per_s'] or 0:>10.1f}  {change}")
+
+    if not args.no_save:
+        print(f"\nSaved to {os.path.relpath(os.path.join(RESULTS_DIR, commit + '.json'), ROOT)}")
+
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
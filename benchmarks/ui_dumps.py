@@ -0,0 +1,45 @@
+from xml.sax.saxutils import quoteattr
+
+
+def _node(tag: str, index: int, package: str, bounds: str, **attrs) -> str:
+    base = {
+        "index": str(index), "package": package, "class": tag, "text": "", "resource-id": "",
+        "checkable": "false", "checked": "false", "clickable": "false", "enabled": "true",
+        "focusable": "false", "focused": "false", "long-clickable": "false", "password": "false",
+        "scrollable": "false", "selected": "false", "bounds": bounds, "displayed": "true",
+    }
+    base.update({key.replace("_", "-"): value for key, value in attrs.items()})
+    return f"<{tag} " + " ".join(f"{key}={quoteattr(value)}" for key, value in base.items())
+
+
+def product_listing(products: int, package: str = "com.example.shop", search_bar: bool = True) -> str:
+    """A UiAutomator2-style dump of a product listing screen with `products` cards under a search toolbar."""
+    parts = ['<?xml version="1.0" encoding="UTF-8"?><hierarchy index="0" class="hierarchy" rotation="0" width="1080" height="2400">']
+    parts.append(_node("android.widget.FrameLayout", 0, package, "[0,0][1080,2400]") + ">")
+    parts.append(_node("android.widget.LinearLayout", 0, package, "[0,0][1080,200]", resource_id=f"{package}:id/toolbar") + ">")
+
+    if search_bar:
+        parts.append(_node("android.widget.TextView", 0, package, "[40,40][400,160]", text="Search for products") + "/>")
+        parts.append(_node("android.widget.EditText", 1, package, "[40,40][1040,160]",
+                           resource_id=f"{package}:id/search_box", clickable="true", focusable="true") + "/>")
+
+    parts.append("</android.widget.LinearLayout>")
+    parts.append(_node("androidx.recyclerview.widget.RecyclerView", 1, package, "[0,200][1080,2400]",
+                       resource_id=f"{package}:id/product_list", scrollable="true") + ">")
+
+    for card in range(products):
+        top = 200 + card * 300
+        parts.append(_node("android.view.ViewGroup", card, package, f"[0,{top}][1080,{top + 300}]",
+                           resource_id=f"{package}:id/product_card", clickable="true") + ">")
+        parts.append(_node("android.widget.ImageView", 0, package, f"[20,{top + 20}][260,{top + 280}]",
+                           resource_id=f"{package}:id/product_image") + "/>")
+        parts.append(_node("android.widget.TextView", 1, package, f"[280,{top + 20}][1060,{top + 80}]",
+                           resource_id=f"{package}:id/product_name", text=f"Product {card} Family Pack 500 g") + "/>")
+        parts.append(_node("android.widget.TextView", 2, package, f"[280,{top + 90}][600,{top + 140}]",
+                           resource_id=f"{package}:id/product_price", text=f"₹{100 + card % 400}") + "/>")
+        parts.append(_node("android.widget.Button", 3, package, f"[800,{top + 200}][1060,{top + 280}]",
+                           resource_id=f"{package}:id/add_button", text="ADD", clickable="true") + "/>")
+        parts.append("</android.view.ViewGroup>")
+
+    parts.append("</androidx.recyclerview.widget.RecyclerView></android.widget.FrameLayout></hierarchy>")
+    return "".join(parts)
@@ -0,0 +1,108 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Optional
+from utils.config import Config
+
+
+class LocatorStore:
+    """On-disk element locators per app package and version, e.g. the resource-id of its search box."""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.LOCATOR_STORE_PATH
+
+        # package -> {"hits": n, "misses": n} for lookups made by this process
+        self.app_stats: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS locators (
+                package TEXT NOT NULL,
+                version TEXT NOT NULL,
+                element TEXT NOT NULL,
+                locator TEXT NOT NULL,
+                updated_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                misses INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (package, version, element)
+            )
+            """
+        )
+        self._connection.commit()
+
+    @classmethod
+    def default(cls) -> Optional["LocatorStore"]:
+        """The shared store, or None when the locator store is disabled."""
+        if not Config.LOCATOR_STORE_ENABLED:
+            return None
+
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+
+        return cls._default
+
+    def get(self, package: str, version: Optional[str], element: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT locator FROM locators WHERE package = ? AND version = ? AND element = ?",
+                (package, version or "", element)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    def put(self, package: str, version: Optional[str], element: str, locator: str) -> None:
+        with self._lock:
+            # The counters survive a re-discovery, so a locator that keeps breaking stays visible
+            self._connection.execute(
+                """
+                INSERT INTO locators (package, version, element, locator, updated_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (package, version, element) DO UPDATE SET locator = excluded.locator,
+                    updated_at = excluded.updated_at
+                """,
+                (package, version or "", element, locator, time.time())
+            )
+            self._connection.commit()
+
+    def record(self, package: str, version: Optional[str], element: str, hit: bool) -> None:
+        """Count a lookup: a hit when the stored locator worked, a miss when it was absent or stale."""
+        column = "hits" if hit else "misses"
+        with self._lock:
+            self.app_stats[package][column] += 1
+            self._connection.execute(
+                f"UPDATE locators SET {column} = {column} + 1 WHERE package = ? AND version = ? AND element = ?",
+                (package, version or "", element)
+            )
+            self._connection.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM locators")
+            self._connection.commit()
+            self.app_stats.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM locators").fetchone()[0]
+
+    def stats(self, package: str = None) -> Dict[str, Dict[str, float]]:
+        """Hits, misses and hit rate per app for this process, optionally for one package only."""
+        with self._lock:
+            counts = {name: dict(values) for name, values in self.app_stats.items()
+                      if package is None or name == package}
+
+        for values in counts.values():
+            lookups = values["hits"] + values["misses"]
+            values["hit_rate"] = round(values["hits"] / lookups, 3) if lookups else 0.0
+
+        return counts
@@ -1,9 +1,13 @@
 import xml.etree.ElementTree as ET
-from selenium.common import NoSuchElementException
+from selenium.common import NoSuchElementException, TimeoutException
 from selenium.webdriver import Keys, ActionChains
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from components.locator_store import LocatorStore
+from components.ui_index import UISnapshot, UISnapshotCache, iter_hierarchy
+from utils.config import Config
+from utils.tracing import traced
+from utils.waits import mark_unsettled, wait_until
 
 
 class SearchBarComponent:
@@ -11,105 +15,184 @@ class SearchBarComponent:
         self.driver = driver
 
     @staticmethod
-    def identify_search_bar(xml_content):
-        """Parse the UI dump XML file and identify search bars."""
+    def identify_search_bar(xml_content, early_exit: bool = False):
+        """Parse the UI dump XML file and identify search bars.
+
+        With early_exit the dump is streamed and scanning stops at the first resource-id match.
+        """
         try:
-            root = ET.fromstring(xml_content)
-            search_results = []
-            strategies = SearchBarComponent.get_identification_strategies()
+            if early_exit:
+                return SearchBarComponent.scan_search_bar(xml_content)[1]
 
-            def search_node(node, parent_path=''):
-                attrs = node.attrib
-                current_path = f"{parent_path}/{node.tag}"
+            return SearchBarComponent.identify_search_bar_in(UISnapshot.from_xml(xml_content))
 
-                if 'bounds' in attrs:
-                    current_path += f"[{attrs['bounds']}]"
+        except ET.ParseError as e:
+            print(f"Error parsing XML content: {e}")
+            return []
 
-                for strategy in strategies:
-                    result = strategy(node, attrs, current_path)
-                    if result:
-                        search_results.append(result)
+    @staticmethod
+    def identify_search_bar_in(snapshot: UISnapshot):
+        """Identify search bars in an already indexed UI snapshot."""
+        # Only nodes with "search" in one of the matched columns can produce a result
+        candidates = sorted(
+            set(snapshot.contains("resource_ids", "search"))
+            | set(snapshot.contains("texts", "search"))
+            | set(snapshot.contains("classes", "search"))
+        )
+
+        search_results = []
+        for index in candidates:
+            search_results.extend(SearchBarComponent._match(
+                snapshot.tags[index], snapshot.attributes[index], lambda: snapshot.path(index),
+                snapshot.resource_ids[index], snapshot.texts[index], snapshot.classes[index], snapshot.enabled[index]
+            ))
+
+        search_results.sort(key=lambda x: (not x.get('is_resource_match', False)))
+        return search_results
 
-                for child in node:
-                    search_node(child, current_path)
+    @staticmethod
+    @traced("ui.scan_search_bar", "parse")
+    def scan_search_bar(xml_content, require_label: bool = True):
+        """Stream a raw dump, stopping once a search label and a resource-id match have both been seen.
+
+        Returns (label_found, search_results); raises ET.ParseError on bad XML.
+        """
+        label_found = not require_label
+        search_results = []
+        open_paths = []
+
+        for index, parent, tag, attrs in iter_hierarchy(xml_content):
+            while open_paths and open_paths[-1][0] != parent:
+                open_paths.pop()
+
+            step = f"{tag}[{attrs['bounds']}]" if 'bounds' in attrs else tag
+            path = f"{open_paths[-1][1] if open_paths else ''}/{step}"
+            open_paths.append((index, path))
+
+            text = attrs.get('text', '').lower()
+            class_name = attrs.get('class', '').lower()
+
+            if not label_found and class_name == "android.widget.textview" and 'search' in text \
+                    and attrs.get('displayed', 'true').lower() != 'false':
+                label_found = True
+
+            matches = SearchBarComponent._match(
+                tag, attrs, lambda: path, attrs.get('resource-id', '').lower(), text, class_name,
+                attrs.get('enabled', 'false').lower() == 'true'
+            )
+            search_results.extend(matches)
 
-            search_node(root)
+            if label_found and any(match['is_resource_match'] for match in search_results):
+                break
 
-            search_results.sort(key=lambda x: (not x.get('is_resource_match', False)))
-            return search_results
+        search_results.sort(key=lambda x: (not x.get('is_resource_match', False)))
+        return label_found, search_results
 
-        except ET.ParseError as e:
-            print(f"Error parsing XML content: {e}")
-            return []
+    @staticmethod
+    def _match(tag, attrs, path, resource_id, text, class_name, enabled):
+        results = []
+        for strategy, is_resource_match in SearchBarComponent.get_identification_strategies():
+            if strategy(resource_id, text, class_name, enabled):
+                results.append({
+                    'element': tag,
+                    'attributes': attrs,
+                    'path': path(),
+                    'is_resource_match': is_resource_match
+                })
+
+        return results
 
     @staticmethod
     def get_identification_strategies():
+        """(predicate over lowercase resource-id, text, class and enabled flag, is_resource_match)"""
         return [
-            SearchBarComponent.match_resource_id,
-            SearchBarComponent.match_text,
-            SearchBarComponent.match_class_name
+            (SearchBarComponent.match_resource_id, True),
+            (SearchBarComponent.match_text, False),
+            (SearchBarComponent.match_class_name, False)
         ]
 
     @staticmethod
-    def match_resource_id(node, attrs, path):
-        resource_id = attrs.get('resource-id', '').lower()
-        if 'search' in resource_id and attrs.get('enabled', 'false').lower() == 'true':
-            return {
-                'element': node.tag,
-                'attributes': attrs,
-                'path': path,
-                'is_resource_match': True
-            }
+    def match_resource_id(resource_id, text, class_name, enabled):
+        return 'search' in resource_id and enabled
 
     @staticmethod
-    def match_text(node, attrs, path):
-        text = attrs.get('text', '').lower()
-        if 'search' in text and attrs.get('enabled', 'false').lower() == 'true':
-            return {
-                'element': node.tag,
-                'attributes': attrs,
-                'path': path,
-                'is_resource_match': False
-            }
+    def match_text(resource_id, text, class_name, enabled):
+        return 'search' in text and enabled
 
     @staticmethod
-    def match_class_name(node, attrs, path):
-        class_name = attrs.get('class', '').lower()
-        if 'search' in class_name and attrs.get('enabled', 'false').lower() == 'true':
-            return {
-                'element': node.tag,
-                'attributes': attrs,
-                'path': path,
-                'is_resource_match': False
-            }
+    def match_class_name(resource_id, text, class_name, enabled):
+        return 'search' in class_name and enabled
 
 
 class SearchBoxFinder(SearchBarComponent):
+    ELEMENT = "search_box"
 
-    def __init__(self, driver):
+    def __init__(self, driver, app_package: str = None, app_version: str = None, store: LocatorStore = None):
         super().__init__(driver=driver)
+        self.app_package = app_package
+        self.app_version = app_version
+        self.store = store
 
-    def _find_search_box(self):
-        """Get the page source and identify search boxes."""
-        page_source = self.driver.page_source
-        search_boxes = self.identify_search_bar(page_source)
-        return search_boxes
+    def find_search_box_id(self, timeout: float = 10):
+        """The search box id stored for this app and version if it is on screen, otherwise discover it again.
 
-    def locate_and_identify_search_box(self, timeout: int = 10):
-        # XPath expression to locate a potential search box
-        search_box_expression = "//android.widget.TextView[contains(translate(@text, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'search')]"
+        The stored id only gets CACHED_LOCATOR_TIMEOUT; a miss falls back to discovery and updates the entry.
+        """
+        store = self.store if self.app_package else None
+        if store is None:
+            return self.locate_and_identify_search_box(timeout=timeout)
 
+        stored_id = store.get(self.app_package, self.app_version, self.ELEMENT)
+        if stored_id and self.is_present(stored_id, min(timeout, Config.CACHED_LOCATOR_TIMEOUT)):
+            store.record(self.app_package, self.app_version, self.ELEMENT, hit=True)
+            print("✅ Search box ID from the locator store:", stored_id)
+            return stored_id
+
+        search_box_id = self.locate_and_identify_search_box(timeout=timeout)
+
+        # Nothing found keeps the old entry: the screen may just not have been ready
+        if search_box_id:
+            store.put(self.app_package, self.app_version, self.ELEMENT, search_box_id)
+
+        store.record(self.app_package, self.app_version, self.ELEMENT, hit=False)
+
+        return search_box_id
+
+    def is_present(self, resource_id: str, timeout: float) -> bool:
         try:
-            # Wait for the element to be visible
-            search_label = WebDriverWait(self.driver, timeout).until(
-                EC.visibility_of_element_located((By.XPATH, search_box_expression))
-            )
+            wait_until(lambda: EC.presence_of_element_located((By.ID, resource_id))(self.driver), timeout)
+            return True
+        except TimeoutException:
+            return False
+
+    def _scan(self):
+        """Look for a search label and search boxes on the current screen.
+
+        The page source is streamed and the scan stops as soon as a confident match is found. Building
+        a full UISnapshot index costs more than one DOM walk, so it is not worth it for a single finder.
+        """
+        return self.scan_search_bar(self.driver.page_source)
+
+    def _find_search_box(self):
+        """Identify search boxes on the current screen."""
+        return self._scan()[1]
+
+    def locate_and_identify_search_box(self, timeout: float = 10):
+        try:
+            label_found, search_boxes = self._scan()
+            if not label_found:
+                def rescan():
+                    UISnapshotCache.invalidate(self.driver)
+                    scan = self._scan()
+                    return scan if scan[0] else None
 
-            if search_label:
-                print("Search label found using XPath.")
+                try:
+                    label_found, search_boxes = wait_until(rescan, timeout)
+                except TimeoutException:
+                    pass
 
-                # Use the SearchBarComponent to identify search boxes in the XML content
-                search_boxes = self._find_search_box()
+            if label_found:
+                print("Search label found in the UI hierarchy.")
 
                 if search_boxes:
                     search_box = search_boxes[0]  # Assuming we use the first result
@@ -133,26 +216,30 @@ class SearchBoxFinder(SearchBarComponent):
 
         return None
 
-    def search_for_item(self, search_text: str, search_box_id: str):
+    def search_for_item(self, search_text: str, search_box_id: str, timeout: float = 10):
         """Click on the search box, type the search term, and press Enter"""
         try:
             # Wait for the search box to be visible and clickable
-            search_box = WebDriverWait(self.driver, 10).until(
-                EC.element_to_be_clickable((By.ID, search_box_id))
+            search_box = wait_until(
+                lambda: EC.element_to_be_clickable((By.ID, search_box_id))(self.driver), timeout,
+                f"Search box '{search_box_id}' was not clickable"
             )
 
             # Click the search box to focus on it
             search_box.click()
+            UISnapshotCache.invalidate(self.driver)
 
             # Wait for the input field to be available again (after the click)
-            search_box = WebDriverWait(self.driver, 10).until(
-                EC.visibility_of_element_located((By.XPATH, "//*[contains(@text, 'Search ')]"))
+            search_box = wait_until(
+                lambda: EC.visibility_of_element_located((By.XPATH, "//*[contains(@text, 'Search ')]"))(self.driver),
+                timeout, "Search input did not appear"
             )
 
             search_box.send_keys(search_text)
             ActionChains(self.driver).send_keys(Keys.ENTER).perform()
 
-            WebDriverWait(self.driver, 2)
+            # Results load while the next step starts; a step that needs them settled waits for that
+            mark_unsettled(self.driver)
 
             print(f"🔍 Searched for '{search_text}' successfully.")
             return True
@@ -160,4 +247,4 @@ class SearchBoxFinder(SearchBarComponent):
         except (Exception, NoSuchElementException) as e:
             print(f"Error searching for '{search_text}': {e}")
 
-            return False
\ No newline at end of file
+            return False
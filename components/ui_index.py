@@ -0,0 +1,210 @@
+import hashlib
+import threading
+import time
+import weakref
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from typing import Dict, List, Optional
+from utils.config import Config
+from utils.tracing import span
+
+
+def iter_hierarchy(xml_content: str, chunk_size: int = None):
+    """Stream (index, parent index, tag, attributes) for every node in document order.
+
+    Nodes are yielded as soon as their start tag is parsed and each subtree is cleared once it
+    closes, so callers can stop early and a full element tree is never held in memory.
+    """
+    chunk_size = chunk_size or Config.UI_PARSE_CHUNK_SIZE
+    parser = ET.XMLPullParser(events=("start", "end"))
+    open_nodes = []
+    index = 0
+
+    for offset in range(0, len(xml_content), chunk_size):
+        parser.feed(xml_content[offset:offset + chunk_size])
+
+        for event, element in parser.read_events():
+            if event == "start":
+                yield index, open_nodes[-1] if open_nodes else -1, element.tag, dict(element.attrib)
+                open_nodes.append(index)
+                index += 1
+
+            else:
+                open_nodes.pop()
+                element.clear()
+
+    parser.close()
+
+
+class UISnapshot:
+    """Array-backed index of one UI hierarchy dump.
+
+    Node i is described by the i-th entry of every column; lowercase copies of the
+    attributes used for matching are computed once, at build time.
+    """
+
+    __slots__ = (
+        "signature", "tags", "attributes", "parents",
+        "resource_ids", "classes", "texts", "descriptions", "enabled", "displayed",
+        "by_resource_id", "by_class", "by_text",
+    )
+
+    def __init__(self, signature: str = ""):
+        self.signature = signature
+        self.tags: List[str] = []
+        self.attributes: List[Dict[str, str]] = []
+        self.parents: List[int] = []
+        self.resource_ids: List[str] = []
+        self.classes: List[str] = []
+        self.texts: List[str] = []
+        self.descriptions: List[str] = []
+        self.enabled: List[bool] = []
+        self.displayed: List[bool] = []
+        self.by_resource_id: Dict[str, List[int]] = defaultdict(list)
+        self.by_class: Dict[str, List[int]] = defaultdict(list)
+        self.by_text: Dict[str, List[int]] = defaultdict(list)
+
+    @classmethod
+    def from_xml(cls, xml_content: str) -> "UISnapshot":
+        """Build the index from a streamed parse; raises ET.ParseError on bad XML."""
+        with span("ui.index", "parse", size=len(xml_content)):
+            snapshot = cls(signature=cls.signature_of(xml_content))
+
+            for _, parent, tag, attrs in iter_hierarchy(xml_content):
+                snapshot._add(tag, attrs, parent)
+
+        return snapshot
+
+    @staticmethod
+    def signature_of(xml_content: str) -> str:
+        return hashlib.blake2b(xml_content.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _add(self, tag: str, attrs: Dict[str, str], parent: int) -> None:
+        index = len(self.tags)
+        resource_id = attrs.get("resource-id", "").lower()
+        class_name = attrs.get("class", "").lower()
+        text = attrs.get("text", "").lower()
+
+        self.tags.append(tag)
+        self.attributes.append(attrs)
+        self.parents.append(parent)
+        self.resource_ids.append(resource_id)
+        self.classes.append(class_name)
+        self.texts.append(text)
+        self.descriptions.append(attrs.get("content-desc", "").lower())
+        self.enabled.append(attrs.get("enabled", "false").lower() == "true")
+        self.displayed.append(attrs.get("displayed", "true").lower() != "false")
+
+        if resource_id:
+            self.by_resource_id[resource_id].append(index)
+            if ":id/" in resource_id:
+                self.by_resource_id[resource_id.split(":id/", 1)[1]].append(index)
+
+        if class_name:
+            self.by_class[class_name].append(index)
+
+        if text:
+            self.by_text[text].append(index)
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def find(self, resource_id: str = None, class_name: str = None, text: str = None,
+             text_contains: str = None, enabled: bool = None, displayed: bool = None) -> List[int]:
+        """Indices of nodes matching every given criterion, in document order."""
+        candidates = None
+        for lookup, value in ((self.by_resource_id, resource_id), (self.by_class, class_name), (self.by_text, text)):
+            if value is not None:
+                matches = lookup.get(value.lower(), [])
+                if candidates is None:
+                    candidates = matches
+                else:
+                    allowed = set(matches)
+                    candidates = [idx for idx in candidates if idx in allowed]
+
+        if candidates is None:
+            candidates = range(len(self.tags))
+
+        if text_contains is not None:
+            needle = text_contains.lower()
+            candidates = [idx for idx in candidates if needle in self.texts[idx]]
+
+        if enabled is not None:
+            candidates = [idx for idx in candidates if self.enabled[idx] == enabled]
+
+        if displayed is not None:
+            candidates = [idx for idx in candidates if self.displayed[idx] == displayed]
+
+        return list(candidates)
+
+    def contains(self, column: str, needle: str) -> List[int]:
+        """Indices whose lowercase `column` (resource_ids, classes, texts, descriptions) contains `needle`."""
+        values = getattr(self, column)
+        needle = needle.lower()
+        return [idx for idx, value in enumerate(values) if needle in value]
+
+    def path(self, index: int) -> str:
+        """Slash separated path of tags (with bounds) from the root to the node."""
+        parts = []
+        while index >= 0:
+            part = self.tags[index]
+            if "bounds" in self.attributes[index]:
+                part += f"[{self.attributes[index]['bounds']}]"
+            parts.append(part)
+            index = self.parents[index]
+
+        return "/" + "/".join(reversed(parts))
+
+
+class UISnapshotCache:
+    """One snapshot per driver, reused until the screen is known (or suspected) to have changed."""
+
+    _entries = weakref.WeakKeyDictionary()
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, driver, max_age: float = None) -> UISnapshot:
+        snapshot = cls.peek(driver, max_age)
+        if snapshot is not None:
+            return snapshot
+
+        with cls._lock:
+            entry = cls._entries.get(driver)
+
+        return cls.refresh(driver, previous=entry["snapshot"] if entry else None)
+
+    @classmethod
+    def peek(cls, driver, max_age: float = None) -> Optional[UISnapshot]:
+        """The driver's snapshot if it is still fresh, without touching the device."""
+        max_age = Config.UI_SNAPSHOT_MAX_AGE if max_age is None else max_age
+
+        with cls._lock:
+            entry = cls._entries.get(driver)
+
+        if entry and not entry["stale"] and time.monotonic() - entry["taken_at"] <= max_age:
+            return entry["snapshot"]
+
+        return None
+
+    @classmethod
+    def refresh(cls, driver, previous: Optional[UISnapshot] = None) -> UISnapshot:
+        xml_content = driver.page_source
+
+        # An unchanged dump does not need to be parsed again
+        if previous is not None and previous.signature == UISnapshot.signature_of(xml_content):
+            snapshot = previous
+        else:
+            snapshot = UISnapshot.from_xml(xml_content)
+
+        with cls._lock:
+            cls._entries[driver] = {"snapshot": snapshot, "taken_at": time.monotonic(), "stale": False}
+
+        return snapshot
+
+    @classmethod
+    def invalidate(cls, driver) -> None:
+        """Mark the driver's snapshot stale, e.g. after a click, typing or launching an app."""
+        with cls._lock:
+            entry = cls._entries.get(driver)
+            if entry:
+                entry["stale"] = True
@@ -0,0 +1,157 @@
+import asyncio
+import subprocess
+import threading
+from typing import Awaitable, List, Optional, Tuple, TypeVar
+from utils.config import Config
+from utils.tracing import span
+
+T = TypeVar("T")
+
+
+class AdbError(Exception):
+    """The adb server refused a request or could not be reached."""
+
+
+class AdbClient:
+    """Talks to the adb server's socket protocol directly instead of forking an `adb` process per command.
+
+    Every request opens one connection to the server (127.0.0.1:5037 by default), sends a length-prefixed
+    service name and reads the reply, so hundreds of shell commands can be in flight on one event loop.
+    Synchronous callers go through run(), which executes on a shared background loop.
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, host: str = None, port: int = None, max_concurrency: int = None, timeout: float = None):
+        self.host = host or Config.ADB_SERVER_HOST
+        self.port = port or Config.ADB_SERVER_PORT
+        self.max_concurrency = max_concurrency or Config.MAX_PARALLEL_ADB_CALLS
+        self.timeout = timeout or Config.ADB_COMMAND_TIMEOUT
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._semaphores = {}
+        self._server_started = False
+
+    @classmethod
+    def default(cls) -> "AdbClient":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+
+        return cls._default
+
+    # Sync bridge
+
+    def run(self, coroutine: Awaitable[T]) -> T:
+        """Run a coroutine on the client's background loop and block until it finishes."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="adb-client", daemon=True).start()
+
+        # Timed on the calling thread, so the wait shows up inside the caller's step
+        with span(f"adb.{getattr(coroutine, '__name__', 'run')}", "adb"):
+            return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    # Wire protocol
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if loop not in self._semaphores:
+            self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+
+        return self._semaphores[loop]
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        try:
+            return await asyncio.wait_for(asyncio.open_connection(self.host, self.port), self.timeout)
+
+        except OSError as e:
+            if self._server_started:
+                raise AdbError(f"adb server not reachable on {self.host}:{self.port}: {e}") from e
+
+            # Nothing listens until someone runs adb once; start the server and try again
+            self._server_started = True
+            await self._start_server()
+            return await self._connect()
+
+    async def _start_server(self) -> None:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                Config.ADB_PATH, "start-server", stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+            )
+            await process.wait()
+
+        except OSError as e:
+            raise AdbError(f"Could not start adb server: {e}") from e
+
+    @staticmethod
+    async def _send(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, service: str) -> None:
+        payload = service.encode("utf-8")
+        writer.write(b"%04x" % len(payload) + payload)
+        await writer.drain()
+
+        status = await reader.readexactly(4)
+        if status == b"OKAY":
+            return
+
+        if status == b"FAIL":
+            length = int(await reader.readexactly(4), 16)
+            message = (await reader.readexactly(length)).decode("utf-8", "replace")
+            raise AdbError(f"{service}: {message}")
+
+        raise AdbError(f"{service}: unexpected reply {status!r}")
+
+    async def _request(self, service: str, serial: Optional[str] = None, length_prefixed: bool = False) -> bytes:
+        """Send one service request (on the device's transport when serial is given) and return the reply."""
+        async with self._semaphore():
+            reader, writer = await self._connect()
+            try:
+                if serial is not None:
+                    await self._send(reader, writer, f"host:transport:{serial}")
+
+                await self._send(reader, writer, service)
+
+                if length_prefixed:
+                    length = int(await asyncio.wait_for(reader.readexactly(4), self.timeout), 16)
+                    return await asyncio.wait_for(reader.readexactly(length), self.timeout)
+
+                # Device services stream their output until the server closes the connection
+                return await asyncio.wait_for(reader.read(), self.timeout)
+
+            except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError) as e:
+                raise AdbError(f"{service}: {e!r}") from e
+
+            finally:
+                writer.close()
+
+    # Services
+
+    async def devices(self) -> List[Tuple[str, str]]:
+        """(serial, state) for every device the server knows about, e.g. ("emulator-5554", "device")."""
+        output = (await self._request("host:devices", length_prefixed=True)).decode("utf-8", "replace")
+        return [tuple(line.split("\t", 1)) for line in output.splitlines() if "\t" in line]
+
+    async def shell(self, serial: str, command: str) -> str:
+        output = await self._request(f"shell:{command}", serial=serial)
+        return output.decode("utf-8", "replace")
+
+    async def exec_out(self, serial: str, command: str) -> bytes:
+        """Raw binary stdout of a device command, without the shell's newline translation."""
+        return await self._request(f"exec:{command}", serial=serial)
+
+    async def shell_many(self, commands: List[Tuple[str, str]]) -> List[object]:
+        """Run (serial, command) pairs concurrently; failures are returned in place as AdbError instances."""
+        return await asyncio.gather(
+            *(self.shell(serial, command) for serial, command in commands), return_exceptions=True
+        )
+
+
+def adb_shell(serial: str, command: str) -> str:
+    return AdbClient.default().run(AdbClient.default().shell(serial, command))
+
+
+def adb_devices() -> List[Tuple[str, str]]:
+    return AdbClient.default().run(AdbClient.default().devices())
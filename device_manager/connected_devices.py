@@ -1,6 +1,9 @@
-import subprocess
+import threading
+import time
 from dataclasses import dataclass
-from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from device_manager.adb_client import AdbClient, AdbError, adb_devices, adb_shell
+from utils.config import Config
 
 
 @dataclass
@@ -19,49 +22,154 @@ def get_connected_devices():
     Get a list of all connected Android devices.
     """
     try:
-        result = subprocess.run(["adb", "devices"], capture_output=True, text=True, check=True)
-        lines = result.stdout.strip().split("\n")[1:]  # Skipping the first line (header)
-        identified_devices = [line.split()[0] for line in lines if "device" in line]
+        return [serial for serial, state in adb_devices() if state == "device"]
 
-        return identified_devices
-
-    except subprocess.CalledProcessError as e:
+    except AdbError as e:
         print("Error executing adb command:", e)
         return []
 
 
-@lru_cache(maxsize=5)
-def get_device_info(device_identifier):
+def parse_getprop(output: str) -> Dict[str, str]:
+    """Parse `getprop` output lines of the form `[key]: [value]`."""
+    properties = {}
+    for line in output.splitlines():
+        key, separator, value = line.partition("]: [")
+        if separator and key.startswith("["):
+            properties[key[1:]] = value.rstrip().rstrip("]")
+
+    return properties
+
+
+def device_info_from_getprop(device_identifier: str, output: str) -> DeviceInfo:
+    properties = parse_getprop(output)
+
+    return DeviceInfo(
+        properties.get("ro.product.model", ""),
+        properties.get("ro.build.version.release", ""),
+        device_identifier
+    )
+
+
+def get_device_info(device_identifier) -> Optional[DeviceInfo]:
     """
-    Get device name and platform version for a given device ID.
+    Get device name and platform version for a given device ID, using a single adb shell call.
     """
     try:
-        device_name = subprocess.run(
-            ["adb", "-s", device_identifier, "shell", "getprop", "ro.product.model"],
-            capture_output=True, text=True, check=True
-        ).stdout.strip()
+        return device_info_from_getprop(device_identifier, adb_shell(device_identifier, "getprop"))
 
-        platform_version = subprocess.run(
-            ["adb", "-s", device_identifier, "shell", "getprop", "ro.build.version.release"],
-            capture_output=True, text=True, check=True
-        ).stdout.strip()
+    except AdbError as e:
+        print(f"Error fetching details for device {device_identifier}:", e)
+        return None
 
-        return DeviceInfo(device_name, platform_version, device_identifier)
 
-    except subprocess.CalledProcessError as e:
-        print(f"Error fetching details for device {device_identifier}:", e)
-        return {"device_name": None, "platform_version": None}
+def get_devices_info(device_identifiers: List[str]) -> Dict[str, Optional[DeviceInfo]]:
+    """
+    Fetch properties of several devices concurrently over the adb server socket.
+    """
+    client = AdbClient.default()
+    outputs = client.run(client.shell_many([(serial, "getprop") for serial in device_identifiers]))
+
+    fetched = {}
+    for serial, output in zip(device_identifiers, outputs):
+        if isinstance(output, Exception):
+            print(f"Error fetching details for device {serial}:", output)
+            fetched[serial] = None
+        else:
+            fetched[serial] = device_info_from_getprop(serial, output)
+
+    return fetched
+
+
+class DeviceRegistry:
+    """Snapshot of connected devices, refreshed in the background and on demand when older than its TTL."""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, ttl: float = None, info_ttl: float = None):
+        self.ttl = Config.DEVICE_LIST_TTL if ttl is None else ttl
+        self.info_ttl = Config.DEVICE_INFO_TTL if info_ttl is None else info_ttl
+
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._devices: List[DeviceInfo] = []
+        self._refreshed_at = 0.0
+        # device id -> (info, fetched at); properties barely change, so they outlive the device list
+        self._info: Dict[str, Tuple[DeviceInfo, float]] = {}
+        self._background = None
+
+    @classmethod
+    def default(cls) -> "DeviceRegistry":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+                cls._default.start_background_refresh()
+
+        return cls._default
+
+    def devices(self, max_age: float = None) -> List[DeviceInfo]:
+        max_age = self.ttl if max_age is None else max_age
+
+        with self._lock:
+            if self._refreshed_at and time.monotonic() - self._refreshed_at <= max_age:
+                return list(self._devices)
+
+        return self.refresh(max_age)
+
+    def refresh(self, max_age: float = None) -> List[DeviceInfo]:
+        # Concurrent callers share one refresh instead of each running adb
+        with self._refresh_lock:
+            with self._lock:
+                if max_age is not None and self._refreshed_at and time.monotonic() - self._refreshed_at <= max_age:
+                    return list(self._devices)
+
+            serials = get_connected_devices()
+            now = time.monotonic()
+
+            with self._lock:
+                stale = [
+                    serial for serial in serials
+                    if serial not in self._info or now - self._info[serial][1] > self.info_ttl
+                ]
+
+            fetched = get_devices_info(stale) if stale else {}
+
+            with self._lock:
+                for serial, info in fetched.items():
+                    # Failures are not cached, the next refresh asks the device again
+                    if info is not None:
+                        self._info[serial] = (info, now)
+
+                self._devices = [self._info[serial][0] for serial in serials if serial in self._info]
+                self._refreshed_at = time.monotonic()
+                return list(self._devices)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._refreshed_at = 0.0
+
+    def start_background_refresh(self, interval: float = None) -> None:
+        interval = Config.DEVICE_REFRESH_INTERVAL if interval is None else interval
+        if self._background is not None or not interval:
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Error refreshing device list: {e}")
+
+                time.sleep(interval)
+
+        self._background = threading.Thread(target=loop, name="device-registry", daemon=True)
+        self._background.start()
 
 
 def get_all_devices_info():
-    identified_devices = get_connected_devices()
-    if not identified_devices:
+    device_info_list = DeviceRegistry.default().devices()
+    if not device_info_list:
         print("No devices connected.")
         return
 
-    device_info_list = []
-    for device_identifier in identified_devices:
-        device_info = get_device_info(device_identifier)
-        device_info_list.append(device_info)
-
-    return device_info_list
\ No newline at end of file
+    return device_info_list
@@ -1,33 +1,158 @@
-import subprocess
-from functools import lru_cache
-from typing import List
+import difflib
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set
+from device_manager.adb_client import adb_shell
+from utils.config import Config
+
+
+class PackageIndex:
+    """Installed packages of one device, indexed by name tokens and refreshed only when the list changes."""
+
+    def __init__(self, device_id: str, ttl: float = None):
+        self.device_id = device_id
+        self.ttl = Config.PACKAGE_INDEX_TTL if ttl is None else ttl
+
+        self.packages: Set[str] = set()
+        self.by_last_segment: Dict[str, Set[str]] = defaultdict(set)
+        self.by_part: Dict[str, Set[str]] = defaultdict(set)
+        self.activities: Dict[str, Optional[str]] = {}
+        # package -> (version, looked up at); an update keeps the package list, so versions expire with the TTL
+        self.versions: Dict[str, tuple] = {}
+
+        self._checksum = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def tokens(package: str) -> List[str]:
+        return [part for part in package.lower().split(".") if part]
+
+    def refresh(self, force: bool = False) -> bool:
+        """Re-list packages only if the on-device checksum of `pm list packages` changed; returns True on change."""
+        with self._lock:
+            if not force and self._checksum and time.monotonic() - self._checked_at <= self.ttl:
+                return False
+
+            # Only 32 bytes come back over adb when nothing changed
+            output = adb_shell(self.device_id, "pm list packages | md5sum").split()
+            checksum = output[0] if output else None
+            self._checked_at = time.monotonic()
+
+            if checksum and checksum == self._checksum and not force:
+                return False
+
+            output = adb_shell(self.device_id, "pm list packages")
+            current = {line[len("package:"):].strip() for line in output.splitlines() if line.startswith("package:")}
+            if not current:
+                # The shell protocol carries no exit status; an empty list means pm failed
+                print(f"Error fetching installed apps for device '{self.device_id}': {output.strip()}")
+                return False
+
+            self._apply(current - self.packages, self.packages - current)
+            self._checksum = checksum
+            return True
+
+    def _apply(self, added: Set[str], removed: Set[str]) -> None:
+        for package in removed:
+            self.packages.discard(package)
+            self.activities.pop(package, None)
+            self.versions.pop(package, None)
+            parts = self.tokens(package)
+            if parts:
+                self.by_last_segment[parts[-1]].discard(package)
+            for part in parts:
+                self.by_part[part].discard(package)
+
+        for package in added:
+            self.packages.add(package)
+            parts = self.tokens(package)
+            if parts:
+                self.by_last_segment[parts[-1]].add(package)
+            for part in parts:
+                self.by_part[part].add(package)
+
+    def find(self, application_name: str) -> Optional[str]:
+        """Exact token lookups first, then substring candidates ranked by how closely they match."""
+        self.refresh()
+        name = application_name.lower().strip()
+        compact = re.sub(r"[^a-z0-9]", "", name)
+
+        # A refresh on another thread mutates these sets in place, so read a copy taken under the lock
+        with self._lock:
+            exact_matches = [set(lookup.get(name) or lookup.get(compact) or ())
+                             for lookup in (self.by_last_segment, self.by_part)]
+            packages = list(self.packages)
+
+        for exact in exact_matches:
+            if exact:
+                return min(exact, key=len)
+
+        candidates = [package for package in packages if compact and compact in package.lower().replace(".", "")]
+        if not candidates:
+            return None
+
+        def rank(package):
+            parts = self.tokens(package)
+            best_part = max(difflib.SequenceMatcher(None, compact, part).ratio() for part in parts)
+            return -best_part, not any(part.startswith(compact) for part in parts), len(package)
+
+        return min(candidates, key=rank)
+
+    def launcher_activity(self, package: str) -> Optional[str]:
+        """Resolve the package's launcher activity, e.g. ".MainActivity" or "com.app.ui.SplashActivity"."""
+        if package in self.activities:
+            return self.activities[package]
+
+        output = adb_shell(
+            self.device_id,
+            f"cmd package resolve-activity --brief -c android.intent.category.LAUNCHER {package}"
+        )
+        lines = output.strip().splitlines()
+        component = lines[-1].strip() if lines else ""
+
+        activity = component.split("/", 1)[1] if "/" in component else None
+        self.activities[package] = activity
+        return activity
+
+    def version(self, package: str) -> Optional[str]:
+        """The installed version as "versionName (versionCode)", or None if dumpsys has no record of it."""
+        cached = self.versions.get(package)
+        if cached and time.monotonic() - cached[1] <= self.ttl:
+            return cached[0]
+
+        output = adb_shell(self.device_id, f"dumpsys package {package} | grep -m 2 -E 'versionCode=|versionName='")
+        name = re.search(r"versionName=(\S+)", output)
+        code = re.search(r"versionCode=(\d+)", output)
+
+        version = None
+        if name or code:
+            version = f"{name.group(1) if name else '?'} ({code.group(1) if code else '?'})"
+
+        self.versions[package] = (version, time.monotonic())
+        return version
+
+
+_indexes: Dict[str, PackageIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_package_index(device_id: str) -> PackageIndex:
+    with _indexes_lock:
+        if device_id not in _indexes:
+            _indexes[device_id] = PackageIndex(device_id)
+
+        return _indexes[device_id]
 
 
-@lru_cache(maxsize=20)
 def get_installed_apps(device_id: str) -> List[str]:
     """Fetches a list of all installed applications on the specified Android device."""
     try:
-        adb_command = ["adb"]
-        if device_id:
-            adb_command.extend(["-s", device_id])
-
-        # Add the shell command to list packages
-        adb_command.extend(["shell", "pm", "list", "packages"])
-
-        result = subprocess.run(
-            adb_command,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-
-        if result.returncode != 0:
-            print(f"Error fetching installed apps for device '{device_id}': {result.stderr}")
-            return []
-
-        # Extract package names from the result
-        packages = [line.split(":")[1] for line in result.stdout.strip().splitlines()]
-        return packages
+        index = get_package_index(device_id)
+        index.refresh()
+        return sorted(index.packages)
 
     except Exception as e:
         print(f"Error: {e}")
@@ -36,24 +161,29 @@ def get_installed_apps(device_id: str) -> List[str]:
 
 def find_app_by_name(application_name: str, device_id: str) -> str | None:
     """Checks if the specified app is installed on the device and returns its package name."""
-    app_name_lower = application_name.lower()
-    installed_apps = get_installed_apps(device_id=device_id)
+    try:
+        return get_package_index(device_id).find(application_name)
 
-    exact_matches = []
-    partial_matches = []
+    except Exception as e:
+        print(f"Error: {e}")
+        return None
 
-    for package in installed_apps:
-        if app_name_lower == package.split('.')[-1].lower():
-            exact_matches.append(package)
 
-        elif app_name_lower in package.lower():
-            partial_matches.append(package)
+def resolve_launcher_activity(package_name: str, device_id: str, default: str = ".MainActivity") -> str:
+    """Returns the launcher activity of an installed package, or `default` when it cannot be resolved."""
+    try:
+        return get_package_index(device_id).launcher_activity(package_name) or default
 
-    if exact_matches:
-        return exact_matches[0]  # Return the first exact match
+    except Exception as e:
+        print(f"Error resolving launcher activity for '{package_name}': {e}")
+        return default
 
-    elif partial_matches:
-        return partial_matches[0]  # Return the first partial match
 
-    return None
+def resolve_app_version(package_name: str, device_id: str) -> str | None:
+    """Returns the installed version of a package, or None when it cannot be read."""
+    try:
+        return get_package_index(device_id).version(package_name)
 
+    except Exception as e:
+        print(f"Error reading the version of '{package_name}': {e}")
+        return None
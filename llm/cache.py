@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+from utils.config import Config
+
+
+def catalogue_fingerprint(actions: Dict[str, Any]) -> str:
+    """Hash of the action catalogue, so cached entries die when an action is added or changed."""
+    catalogue = sorted(
+        (act.name, act.description, list(act.required_params or [])) for act in actions.values()
+    )
+    return hashlib.sha256(json.dumps(catalogue).encode("utf-8")).hexdigest()[:16]
+
+
+class ActionCache:
+    """On-disk instruction -> action cache with LRU and TTL eviction."""
+
+    def __init__(self, path: str = None, max_entries: int = None, ttl: float = None):
+        self.path = path or Config.LLM_CACHE_PATH
+        self.max_entries = max_entries or Config.LLM_CACHE_MAX_ENTRIES
+        self.ttl = ttl if ttl is not None else Config.LLM_CACHE_TTL
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        import sqlite3
+
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS actions (
+                key TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                action TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON actions(last_used)")
+        self._connection.commit()
+
+    @staticmethod
+    def normalize(instruction: str) -> str:
+        """Collapse whitespace and trailing punctuation; case is kept because it can be part of an argument."""
+        return re.sub(r"\s+", " ", instruction).strip().rstrip(".!")
+
+    @classmethod
+    def make_key(cls, instruction: str, model: str, fingerprint: str) -> str:
+        raw = "\x1f".join([cls.normalize(instruction), model or "", fingerprint])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, instruction: str, model: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        key = self.make_key(instruction, model, fingerprint)
+        now = time.time()
+
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT action, created_at FROM actions WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row and self.ttl and now - row[1] > self.ttl:
+                self._connection.execute("DELETE FROM actions WHERE key = ?", (key,))
+                self._connection.commit()
+                row = None
+
+            if not row:
+                self.misses += 1
+                return None
+
+            self._connection.execute(
+                "UPDATE actions SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            self._connection.commit()
+            self.hits += 1
+
+        return json.loads(row[0])
+
+    def put(self, instruction: str, model: str, fingerprint: str, action: Dict[str, Any]) -> None:
+        key = self.make_key(instruction, model, fingerprint)
+        now = time.time()
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO actions (key, fingerprint, action, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, fingerprint, json.dumps(action), now, now)
+            )
+            self._evict(fingerprint)
+            self._connection.commit()
+
+    def _evict(self, fingerprint: str) -> None:
+        # Entries written for another version of the action catalogue can never be hit again
+        self._connection.execute("DELETE FROM actions WHERE fingerprint != ?", (fingerprint,))
+
+        if self.ttl:
+            self._connection.execute("DELETE FROM actions WHERE created_at < ?", (time.time() - self.ttl,))
+
+        self._connection.execute(
+            """
+            DELETE FROM actions WHERE key IN (
+                SELECT key FROM actions ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,)
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM actions")
+            self._connection.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM actions").fetchone()[0]
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hit_rate, 3),
+        }
@@ -1,9 +1,6 @@
-from dataclasses import dataclass
-from typing import Optional, List, Callable
-from actions.open_app import OpenAppAction
-from actions.search import SearchAction
-from actions.take_screenshot import TakeScreenshotAction
-from actions.wait_for_screen import WaitForScreenAction
+import importlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, List, Callable
 
 
 @dataclass
@@ -11,32 +8,80 @@ class Action:
     name: str
     required_params: Optional[List[str]] = None
     description: str = ""
-    function: Callable = None
+    # "module:ClassName" of the implementation; imported on first use so that reading the
+    # catalogue (prompts, tool schemas, cache fingerprints) does not load selenium and appium
+    target: str = ""
+    # Other names a required param goes by in the bundled dataset and the rule tier, e.g. query for search_term
+    param_aliases: Dict[str, List[str]] = field(default_factory=dict)
+    _function: Callable = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def function(self) -> Callable:
+        if self._function is None:
+            module_name, _, attribute = self.target.partition(":")
+            self._function = getattr(importlib.import_module(module_name), attribute)
+
+        return self._function
+
+    @function.setter
+    def function(self, value: Callable) -> None:
+        self._function = value
+
+    def accepts(self, arguments: Optional[Dict[str, Any]]) -> bool:
+        """Every required param (or one of its aliases) has a non-empty value."""
+        arguments = arguments or {}
+        return all(
+            any(arguments.get(key) not in (None, "") for key in [param, *self.param_aliases.get(param, [])])
+            for param in self.required_params or []
+        )
+
+    def to_tool_schema(self) -> Dict[str, Any]:
+        """Describe the action as an OpenAI function-calling tool."""
+        params = self.required_params or []
+
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": {
+                    "type": "object",
+                    "properties": {param: {"type": "string"} for param in params},
+                    "required": list(params),
+                    "additionalProperties": False,
+                },
+            },
+        }
 
 
 action_handlers = {
     "open_app": Action(
         name="open_app",
         description="Opens a specified application",
-        function=OpenAppAction
+        target="actions.open_app:OpenAppAction"
     ),
 
     "wait_for_screen": Action(
         name="wait_for_screen",
         description="Waits for a specific screen to load",
-        function=WaitForScreenAction
+        target="actions.wait_for_screen:WaitForScreenAction"
     ),
 
     "take_screenshot": Action(
         name="take_screenshot",
         description="Takes a screenshot of the current screen",
-        function=TakeScreenshotAction
+        target="actions.take_screenshot:TakeScreenshotAction"
     ),
 
     "search": Action(
         name="search",
         description="Performs a search using the search bar",
         required_params=["search_term"],
-        function=SearchAction
+        target="actions.search:SearchAction",
+        param_aliases={"search_term": ["query"]}
     ),
-}
\ No newline at end of file
+}
+
+
+def tool_schemas() -> List[Dict[str, Any]]:
+    return [action.to_tool_schema() for action in action_handlers.values()]
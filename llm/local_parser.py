@@ -0,0 +1,303 @@
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from utils.config import Config
+
+DATASET_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "fine-tuned", "dataset", "natural_language_dataset.csv"
+)
+
+
+@dataclass
+class Example:
+    text: str
+    name: str
+    arguments: Dict[str, Any]
+    template: Optional[re.Pattern] = None
+    transforms: Optional[Dict[str, str]] = None
+
+
+class LocalIntentParser:
+    """Offline instruction parser: TF-IDF nearest neighbours over the bundled dataset plus template argument extraction."""
+
+    MAX_ENUM_VALUES = 20
+    # Typed by the user: taken from the instruction as written, never snapped to a dataset value
+    FREE_TEXT_PARAMS = frozenset({"query", "search_term", "item", "product_name"})
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, examples: List[Example], top_k: int = 10, min_score: float = None):
+        self.examples = examples
+        self.top_k = top_k
+        self.min_score = min_score if min_score is not None else Config.LOCAL_PARSER_MIN_SCORE
+
+        # Arguments with only a handful of distinct values (payment methods, ...) are treated as enums
+        values = defaultdict(set)
+        for example in examples:
+            for key, value in example.arguments.items():
+                if isinstance(value, str) and key not in self.FREE_TEXT_PARAMS:
+                    values[(example.name, key)].add(value)
+
+        self.enums = {slot: options for slot, options in values.items() if len(options) <= self.MAX_ENUM_VALUES}
+
+        document_frequency = Counter()
+        vectors = []
+        for example in examples:
+            # Argument values are left out so similarity is driven by the phrasing, not by item names
+            terms = Counter(self._tokenize(self._skeleton(example)))
+            document_frequency.update(terms.keys())
+            vectors.append(terms)
+
+        total = len(examples)
+        self.idf = {term: math.log((total + 1) / (df + 1)) + 1 for term, df in document_frequency.items()}
+
+        # Inverted index of term -> [(example index, weight)] keeps lookups proportional to the query length
+        self.postings = defaultdict(list)
+        for idx, terms in enumerate(vectors):
+            for term, weight in self._weigh(terms).items():
+                self.postings[term].append((idx, weight))
+
+    @classmethod
+    def from_csv(cls, path: str = DATASET_PATH, **kwargs) -> "LocalIntentParser":
+        return cls(cls.load_examples(path), **kwargs)
+
+    @classmethod
+    def default(cls) -> "LocalIntentParser":
+        """Shared parser built from the bundled dataset on first use."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls.from_csv(Config.LOCAL_PARSER_DATASET or DATASET_PATH)
+
+        return cls._default
+
+    @staticmethod
+    def load_examples(path: str) -> List[Example]:
+        import ast
+        import csv
+
+        examples = []
+        with open(path, newline="", encoding="utf-8") as dataset:
+            for row in csv.DictReader(dataset):
+                target = row["target_text"]
+                try:
+                    action = json.loads(target)
+                except json.JSONDecodeError:
+                    # A few rows are written as Python literals with single quotes
+                    action = ast.literal_eval(target)
+
+                examples.append(Example(
+                    text=row["input_text"].strip(),
+                    name=action["name"],
+                    arguments=action.get("arguments") or {}
+                ))
+
+        return examples
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        words = re.findall(r"[a-z0-9]+", text.lower())
+        return words + [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+    def _weigh(self, terms: Counter) -> Dict[str, float]:
+        weights = {
+            term: (1 + math.log(count)) * self.idf[term]
+            for term, count in terms.items() if term in self.idf
+        }
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        return {term: weight / norm for term, weight in weights.items()}
+
+    def neighbours(self, query: str) -> List[Tuple[float, int]]:
+        scores = defaultdict(float)
+        for term, weight in self._weigh(Counter(self._tokenize(query))).items():
+            for idx, example_weight in self.postings[term]:
+                scores[idx] += weight * example_weight
+
+        return sorted(((score, idx) for idx, score in scores.items()), reverse=True)[:self.top_k]
+
+    def parse(self, query: str, min_score: float = None) -> Dict[str, Any] | None:
+        """Return {"name", "arguments"} for the instruction, or None when no example is close enough."""
+        neighbours = self.neighbours(query)
+        if not neighbours or neighbours[0][0] < (self.min_score if min_score is None else min_score):
+            return None
+
+        best = self.examples[neighbours[0][1]]
+        candidates = [self.examples[idx] for _, idx in neighbours if self.examples[idx].name == best.name]
+
+        for example in candidates:
+            arguments = self._extract_arguments(example, query)
+            if arguments is not None:
+                return {"name": example.name, "arguments": arguments}
+
+        # The intent is known but no phrasing matched closely enough to lift the argument values
+        return {"name": best.name, "arguments": {}}
+
+    def _extract_arguments(self, example: Example, query: str) -> Dict[str, Any] | None:
+        if example.template is None:
+            example.template, example.transforms = self._build_template(example)
+
+        match = example.template.fullmatch(query.strip())
+        if not match:
+            return None
+
+        arguments = {}
+        for key, value in example.arguments.items():
+            group = self._group_name(key)
+            if group in example.template.groupindex and key in self.FREE_TEXT_PARAMS:
+                arguments[key] = match.group(group).strip()
+
+            elif group in example.template.groupindex:
+                extracted = self._normalize_value(
+                    match.group(group).strip(), example.transforms.get(key), self.enums.get((example.name, key))
+                )
+                arguments[key] = int(extracted) if isinstance(value, int) and extracted.isdigit() else extracted
+
+            else:
+                # Values that never appear in the text (e.g. "cod" for "Cash on Delivery") are implied by the phrasing
+                arguments[key] = value
+
+        return arguments
+
+    @staticmethod
+    def _locate(text: str, value: Any) -> List[Tuple[int, int, Optional[str]]]:
+        """Every place an argument value is written in the text, with how it was normalized."""
+        literal = str(value)
+        if not literal:
+            return []
+
+        if isinstance(value, int):
+            return [(match.start(), match.end(), None) for match in re.finditer(rf"\b{literal}\b", text)]
+
+        for candidate, transform in ((literal, None), (literal, "lower"), (literal.replace("_", " "), "snake")):
+            flags = re.IGNORECASE if transform else 0
+            found = [(match.start(), match.end(), transform) for match in re.finditer(re.escape(candidate), text, flags)]
+            if found:
+                return found
+
+        return []
+
+    @staticmethod
+    def _transform(value: str, transform: Optional[str]) -> str:
+        if transform == "lower":
+            return value.lower()
+
+        if transform == "snake":
+            return re.sub(r"\s+", "_", value.lower())
+
+        return value
+
+    @classmethod
+    def _normalize_value(cls, value: str, transform: Optional[str], options: Optional[set]) -> str:
+        normalized = cls._transform(value, transform)
+        if not options or normalized in options:
+            return normalized
+
+        # The neighbour may have spelled its value differently, prefer a form the dataset actually uses
+        for candidate in (cls._transform(value, other) for other in (None, "lower", "snake")):
+            if candidate in options:
+                return candidate
+
+        return normalized
+
+    @classmethod
+    def _spans(cls, example: Example) -> List[Tuple[int, int, str, Any, Optional[str]]]:
+        spans = []
+        # Text values go first so a number inside an item name ("5 Star") is not taken for the quantity
+        for key, value in sorted(example.arguments.items(), key=lambda item: isinstance(item[1], int)):
+            for start, end, transform in cls._locate(example.text, value):
+                if not any(start < taken_end and end > taken_start for taken_start, taken_end, *_ in spans):
+                    spans.append((start, end, key, value, transform))
+                    break
+
+        return sorted(spans, key=lambda span: span[0])
+
+    @classmethod
+    def _skeleton(cls, example: Example) -> str:
+        text, cursor = "", 0
+        for start, end, *_ in cls._spans(example):
+            text += example.text[cursor:start] + " "
+            cursor = end
+
+        return text + example.text[cursor:]
+
+    @classmethod
+    def _build_template(cls, example: Example) -> Tuple[re.Pattern, Dict[str, str]]:
+        pattern, cursor, transforms = "", 0, {}
+        for start, end, key, value, transform in cls._spans(example):
+            capture = r"\d+" if isinstance(value, int) else r".+?"
+            before = example.text[cursor:start]
+
+            # Quotes around a value are optional: "Search for 'Books'" also covers "Search for books"
+            quoted = before[-1:] in ("'", '"') and example.text[end:end + 1] == before[-1:]
+            if quoted:
+                before, end = before[:-1], end + 1
+
+            optional_quote = r"['\"]?" if quoted else ""
+            pattern += cls._literal(before)
+            pattern += f"{optional_quote}(?P<{cls._group_name(key)}>{capture}){optional_quote}"
+            transforms[key] = transform
+            cursor = end
+
+        pattern += cls._literal(example.text[cursor:].rstrip(".?! "))
+        return re.compile(pattern + r"[.?!\s]*", re.IGNORECASE), transforms
+
+    @staticmethod
+    def _group_name(key: str) -> str:
+        return "arg_" + re.sub(r"[^0-9a-zA-Z_]", "_", key)
+
+    @staticmethod
+    def _literal(text: str) -> str:
+        return r"\s+".join(re.escape(part) for part in text.split(" "))
+
+
+def _comparable(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value.lower() if key in LocalIntentParser.FREE_TEXT_PARAMS and isinstance(value, str) else value
+            for key, value in arguments.items()}
+
+
+def evaluate(path: str = DATASET_PATH, holdout: float = 0.2, seed: int = 7) -> Dict[str, Any]:
+    """Accuracy and latency of the local parser on a held-out split of the dataset."""
+    import random
+
+    examples = LocalIntentParser.load_examples(path)
+    random.Random(seed).shuffle(examples)
+    split = int(len(examples) * (1 - holdout))
+    train, test = examples[:split], examples[split:]
+
+    started = time.perf_counter()
+    parser = LocalIntentParser(train)
+    build_seconds = time.perf_counter() - started
+
+    intent_hits, exact_hits, latencies = 0, 0, []
+    for example in test:
+        started = time.perf_counter()
+        action = parser.parse(example.text)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        if action and action["name"] == example.name:
+            intent_hits += 1
+            # The dataset lowercases some free-text values ("Search for 'Phones'" -> phones); case is not an error
+            if _comparable(action["arguments"]) == _comparable(example.arguments):
+                exact_hits += 1
+
+    latencies.sort()
+    return {
+        "train_examples": len(train),
+        "test_examples": len(test),
+        "build_ms": round(build_seconds * 1000, 1),
+        "intent_accuracy": round(intent_hits / len(test), 4),
+        "exact_match_accuracy": round(exact_hits / len(test), 4),
+        "latency_p50_ms": round(latencies[len(latencies) // 2], 3),
+        "latency_p95_ms": round(latencies[int(len(latencies) * 0.95)], 3),
+    }
+
+
+if __name__ == "__main__":
+    print(json.dumps(evaluate(), indent=2))
@@ -1,25 +1,212 @@
+import json
 import os
-from typing import Any, Dict, Tuple
-from openai import OpenAI
-from llm.function_calling import action_handlers
-from dotenv import load_dotenv
+import re
+import threading
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+from llm.cache import ActionCache, catalogue_fingerprint
+from llm.function_calling import action_handlers, tool_schemas
+from utils.config import Config
+from utils.tracing import traced
 
-load_dotenv()
+# openai, httpx and dotenv are imported on first use; importing the parser stays cheap for
+# the local and rule-based paths that never talk to an endpoint
+if TYPE_CHECKING:
+    import asyncio
+    import httpx
+    from openai import AsyncOpenAI, OpenAI
+
+_env_loaded = False
+_env_lock = threading.Lock()
+
+
+def _load_env() -> None:
+    global _env_loaded
+
+    with _env_lock:
+        if not _env_loaded:
+            from dotenv import load_dotenv
+
+            load_dotenv()
+            _env_loaded = True
+
+
+class _EnvSetting:
+    """Class attribute read from the environment (and .env) when first accessed."""
+
+    def __init__(self, variable: str):
+        self.variable = variable
+
+    def __get__(self, instance, owner):
+        _load_env()
+        return os.environ.get(self.variable)
 
 
 class LLMAutomation:
 
-    base_url = os.environ.get("OPENAI_BASE_URL")
-    api_key = os.environ.get("OPENAI_API_KEY")
-    model = os.environ.get("OPENAI_MODEL")
+    base_url = _EnvSetting("OPENAI_BASE_URL")
+    api_key = _EnvSetting("OPENAI_API_KEY")
+    model = _EnvSetting("OPENAI_MODEL")
+
+    _cache = None
+    _cache_lock = threading.Lock()
+
+    # One long-lived client per endpoint keeps HTTP connections warm across calls and threads
+    _clients: Dict[Tuple[str, str], "OpenAI"] = {}
+    # Per event loop; entries go away with their loop instead of piling up across asyncio.run() calls
+    _async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], AsyncOpenAI]]" = (
+        weakref.WeakKeyDictionary())
+    _client_lock = threading.Lock()
+
+    @classmethod
+    def get_cache(cls) -> ActionCache | None:
+        """Return the shared on-disk action cache, or None when caching is disabled."""
+        if not Config.LLM_CACHE_ENABLED:
+            return None
+
+        with cls._cache_lock:
+            if cls._cache is None:
+                cls._cache = ActionCache()
+
+        return cls._cache
+
+    @classmethod
+    def get_client(cls) -> "OpenAI":
+        """Return the shared client for the configured endpoint, creating it on first use."""
+        from openai import DefaultHttpxClient, OpenAI
+
+        key = (cls.base_url, cls.api_key)
+
+        with cls._client_lock:
+            client = cls._clients.get(key)
+            if client is None:
+                client = OpenAI(
+                    base_url=cls.base_url,
+                    api_key=cls.api_key,
+                    timeout=cls._timeout(),
+                    max_retries=Config.LLM_MAX_RETRIES,
+                    http_client=DefaultHttpxClient(limits=cls._limits()),
+                )
+                cls._clients[key] = client
+
+        return client
+
+    @classmethod
+    def get_async_client(cls) -> "AsyncOpenAI":
+        """Return the shared async client for the running event loop."""
+        import asyncio
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        # httpx async connection pools are bound to the loop they were opened on
+        loop = asyncio.get_running_loop()
+        key = (cls.base_url, cls.api_key)
+
+        with cls._client_lock:
+            # Pooled connections keep a closed loop reachable, so its clients are dropped explicitly
+            for closed in [other for other in cls._async_clients if other.is_closed()]:
+                del cls._async_clients[closed]
+
+            clients = cls._async_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None:
+                client = AsyncOpenAI(
+                    base_url=cls.base_url,
+                    api_key=cls.api_key,
+                    timeout=cls._timeout(),
+                    max_retries=Config.LLM_MAX_RETRIES,
+                    http_client=DefaultAsyncHttpxClient(limits=cls._limits()),
+                )
+                clients[key] = client
+
+        return client
+
+    @staticmethod
+    def _timeout() -> "httpx.Timeout":
+        import httpx
+
+        return httpx.Timeout(Config.LLM_TIMEOUT, connect=Config.LLM_CONNECT_TIMEOUT)
+
+    @staticmethod
+    def _limits() -> "httpx.Limits":
+        import httpx
+
+        return httpx.Limits(
+            max_connections=Config.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=Config.LLM_MAX_CONNECTIONS,
+            keepalive_expiry=Config.LLM_KEEPALIVE_EXPIRY,
+        )
 
     @classmethod
-    def call_llm(cls, query: str) -> Dict[str, Any] | None:
+    @traced("llm.call_llm", "llm")
+    def call_llm(cls, query: str, check_cache: bool = True) -> Dict[str, Any] | None:
         """Call the LLM to interpret the instruction and return action name + arguments."""
+        cache = cls.get_cache()
+        fingerprint = catalogue_fingerprint(action_handlers)
+
+        if cache is not None and check_cache:
+            cached_action = cache.get(query, cls.model, fingerprint)
+            if cached_action is not None:
+                return cached_action
+
+        # 429 and 5xx responses are retried with exponential backoff by the client itself
+        client = cls.get_client()
+        if Config.LLM_MODE == "tools":
+            response = client.chat.completions.create(**cls._tool_request(query))
+        else:
+            response = client.completions.create(**cls._completion_request(query))
+
+        return cls._handle_response(query, response, cache, fingerprint)
+
+    @classmethod
+    @traced("llm.acall_llm", "llm")
+    async def acall_llm(cls, query: str, check_cache: bool = True) -> Dict[str, Any] | None:
+        """Async variant of call_llm sharing the same cache and response handling."""
+        cache = cls.get_cache()
+        fingerprint = catalogue_fingerprint(action_handlers)
+
+        if cache is not None and check_cache:
+            cached_action = cache.get(query, cls.model, fingerprint)
+            if cached_action is not None:
+                return cached_action
+
+        client = cls.get_async_client()
+        if Config.LLM_MODE == "tools":
+            response = await client.chat.completions.create(**cls._tool_request(query))
+        else:
+            response = await client.completions.create(**cls._completion_request(query))
+
+        return cls._handle_response(query, response, cache, fingerprint)
+
+    @classmethod
+    def _completion_request(cls, query: str) -> Dict[str, Any]:
+        return {
+            "model": cls.model,
+            "prompt": cls._build_prompt(query),
+            "max_tokens": 150,
+            "temperature": 0.0,
+        }
+
+    @classmethod
+    def _tool_request(cls, query: str) -> Dict[str, Any]:
+        # The catalogue travels as tool schemas, so the prompt is just the instruction
+        return {
+            "model": cls.model,
+            "messages": [
+                {"role": "system", "content": "Call the one tool that performs the user's app testing instruction."},
+                {"role": "user", "content": query},
+            ],
+            "tools": tool_schemas(),
+            "tool_choice": "required",
+            "max_tokens": 150,
+            "temperature": 0.0,
+        }
+
+    @staticmethod
+    def _build_prompt(query: str) -> str:
         # Create a list of available actions for the prompt
         available_actions = "\n".join([f"- {act.name}: {act.description}" for act in action_handlers.values()])
 
-        prompt = f"""
+        return f"""
                     Interpret the following instruction and generate the corresponding action and parameters.
                         Available actions:
                         {available_actions}
@@ -31,31 +218,65 @@ class LLMAutomation:
                         Parameters: <param1>=<value1>, <param2>=<value2>
                 """
 
-        openai_init = OpenAI(
-            base_url=cls.base_url,
-            api_key=cls.api_key
-        )
-
-        response = openai_init.completions.create(
-            model=cls.model,
-            prompt=prompt,
-            max_tokens=150,
-            temperature=0.0,
-        )
-
-        action_response = response.choices[0].text.strip()
+    @classmethod
+    def _handle_response(cls, query: str, response: Any, cache: ActionCache | None,
+                         fingerprint: str) -> Dict[str, Any] | None:
+        action_response = None
         try:
-            action_name, args = cls._parse_action_response(action_response)
+            if Config.LLM_MODE == "tools":
+                action_response = response.choices[0].message
+                action_name, args = cls._parse_tool_call(action_response)
+            else:
+                action_response = response.choices[0].text.strip()
+                action_name, args = cls._parse_action_response(action_response)
 
             if action_name.lower() not in {k.lower() for k in action_handlers.keys()}:
                 raise ValueError(f"Invalid action '{action_name}'. Available actions are: {list(action_handlers.keys())}")
 
-            return {"name": action_name.lower(), "arguments": args}
+            # An empty required value would run as a no-op, and must not be cached as an answer
+            if not action_handlers[action_name.lower()].accepts(args):
+                raise ValueError(f"Missing or empty required parameters for '{action_name}': {args}")
+
+            action = {"name": action_name.lower(), "arguments": args}
+            if cache is not None:
+                cache.put(query, cls.model, fingerprint, action)
+
+            return action
 
         except Exception as e:
             print(f"Error parsing LLM response: {action_response}\nError details: {str(e)}")
             return None
 
+    @staticmethod
+    def _parse_tool_call(message: Any) -> Tuple[str, Dict[str, Any]]:
+        """Validate the structured tool call returned in function-calling mode."""
+        if not message.tool_calls:
+            raise ValueError("The model did not call any tool.")
+
+        function = message.tool_calls[0].function
+        action = action_handlers.get(function.name)
+        if action is None:
+            raise ValueError(f"Invalid action '{function.name}'. Available actions are: {list(action_handlers.keys())}")
+
+        arguments = json.loads(function.arguments or "{}")
+        if not isinstance(arguments, dict):
+            raise ValueError(f"Arguments for '{function.name}' must be an object, got: {function.arguments}")
+
+        missing = [param for param in action.required_params or [] if param not in arguments]
+        if missing:
+            raise ValueError(f"Missing required parameters for '{function.name}': {missing}")
+
+        return function.name, arguments
+
+    @staticmethod
+    def _clean_free_text(value: str) -> str:
+        """Drop a code fence or a pair of quotes wrapped around a completion-mode value; the value itself is kept."""
+        value = re.sub(r"^\s*```|```\s*$", "", value).strip()
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"`":
+            value = value[1:-1].strip()
+
+        return value
+
     @staticmethod
     def _parse_action_response(action_response: str) -> Tuple[str, Dict[str, Any]]:
         """Parse the LLM response into action name and arguments."""
@@ -74,12 +295,12 @@ class LLMAutomation:
             if params_line:
                 params_str = params_line.split(':', 1)[1].strip()
                 if params_str:
-                    # Split parameters by comma and handle potential spaces
-                    param_pairs = [p.strip() for p in params_str.split(',')]
+                    # Split only on commas that start another key=value pair, so values may contain commas
+                    param_pairs = [p.strip() for p in re.split(r",\s*(?=[A-Za-z_]\w*\s*=)", params_str)]
                     for pair in param_pairs:
                         if '=' in pair:
                             key, value = pair.split('=', 1)
-                            parameters[key.strip()] = value.strip()
+                            parameters[key.strip()] = LLMAutomation._clean_free_text(value)
 
             return action_name, parameters
 
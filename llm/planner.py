@@ -0,0 +1,135 @@
+import threading
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from llm.resolver import InstructionResolver, Resolution
+from utils.config import Config
+from utils.tracing import submit_in_context
+
+# concurrent.futures pulls in logging; it is imported when a plan is first resolved
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+
+@dataclass(frozen=True)
+class PlannedStep:
+    instruction: str
+    action: Optional[Dict[str, Any]] = None
+    tier: Optional[str] = None
+    elapsed: float = 0.0
+    # element name -> resource-id known from a recorded run, tried before discovery
+    locators: Optional[Dict[str, str]] = None
+
+
+def plan_instructions(instructions: List[str], max_workers: int = None,
+                      resolver: InstructionResolver = None) -> List[PlannedStep]:
+    """Translate an instruction list into actions once, so every device in a run can share it."""
+    resolver = resolver or InstructionResolver.default()
+    unique_instructions = list(dict.fromkeys(instructions))
+    if not unique_instructions:
+        return []
+
+    max_workers = min(max_workers or Config.MAX_PARALLEL_LLM_CALLS, len(unique_instructions))
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Identical lines are only resolved once and the slow tiers overlap
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = [submit_in_context(pool, resolver.resolve, instruction) for instruction in unique_instructions]
+        resolutions = {instruction: future.result() for instruction, future in zip(unique_instructions, futures)}
+
+    return [_to_step(resolutions[instruction]) for instruction in instructions]
+
+
+def _to_step(resolution: Resolution) -> PlannedStep:
+    if resolution.action is None:
+        print(f"Unable to interpret instruction '{resolution.instruction}'")
+
+    return PlannedStep(
+        instruction=resolution.instruction,
+        action=resolution.action,
+        tier=resolution.tier,
+        elapsed=resolution.elapsed
+    )
+
+
+class PlanStream:
+    """A plan resolved in the background while devices already run it, in instruction order.
+
+    Steps are resolved at most `lookahead` ahead of the furthest device; indexing blocks until that step
+    is resolved. Once every consumer has released the stream, work that has not started is cancelled,
+    so a device failing early does not pay for resolving the rest of the instructions.
+    """
+
+    def __init__(self, instructions: List[str], consumers: int = 1, lookahead: int = None,
+                 max_workers: int = None, resolver: InstructionResolver = None):
+        self.instructions = list(instructions)
+        self.lookahead = Config.PIPELINE_LOOKAHEAD if lookahead is None else lookahead
+        self.resolver = resolver or InstructionResolver.default()
+
+        self._futures: Dict[str, "Future"] = {}
+        self._steps: Dict[str, PlannedStep] = {}
+        self._submitted = 0
+        self._consumers = consumers
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        unique_count = len(set(self.instructions)) or 1
+        self._pool = ThreadPoolExecutor(max_workers=min(max_workers or Config.MAX_PARALLEL_LLM_CALLS, unique_count))
+
+        self._advance(0)
+
+    def __len__(self) -> int:
+        return len(self.instructions)
+
+    def __getitem__(self, index: int) -> PlannedStep:
+        self._advance(index)
+        instruction = self.instructions[index]
+
+        resolution = self._futures[instruction].result()
+        with self._lock:
+            if instruction not in self._steps:
+                self._steps[instruction] = _to_step(resolution)
+
+            return self._steps[instruction]
+
+    def _advance(self, position: int) -> None:
+        with self._lock:
+            if self._cancelled:
+                return
+
+            limit = min(len(self.instructions), position + self.lookahead + 1)
+            while self._submitted < limit:
+                instruction = self.instructions[self._submitted]
+                if instruction not in self._futures:
+                    self._futures[instruction] = submit_in_context(self._pool, self.resolver.resolve, instruction)
+                self._submitted += 1
+
+    def release(self) -> None:
+        """A consumer is done with the plan, whether it finished or failed."""
+        with self._lock:
+            self._consumers -= 1
+            done = self._consumers <= 0
+
+        if done:
+            self.cancel()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._cancelled = True
+
+        # Resolutions already in flight finish in the background; queued ones never start
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def steps(self) -> List[PlannedStep]:
+        """The plan as far as it was resolved; instructions that were never resolved have no action."""
+        with self._lock:
+            steps = dict(self._steps)
+            futures = dict(self._futures)
+
+        for instruction, future in futures.items():
+            if instruction not in steps and future.done() and not future.cancelled() and not future.exception():
+                steps[instruction] = _to_step(future.result())
+
+        return [steps.get(instruction) or PlannedStep(instruction=instruction) for instruction in self.instructions]
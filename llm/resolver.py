@@ -0,0 +1,142 @@
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from llm.cache import catalogue_fingerprint
+from llm.function_calling import action_handlers
+from llm.local_parser import LocalIntentParser
+from llm.parser import LLMAutomation
+from utils.config import Config
+
+
+@dataclass
+class Resolution:
+    instruction: str
+    action: Optional[Dict[str, Any]] = None
+    tier: Optional[str] = None
+    elapsed: float = 0.0
+    attempts: List[Tuple[str, float]] = field(default_factory=list)
+
+
+class RuleTier:
+    """Deterministic patterns for instructions that map trivially to an action."""
+
+    name = "rules"
+    # Answers from untrusted tiers are only used when they name a known action with all its required params
+    trusted = False
+
+    rules = [
+        (re.compile(r"(?:open|launch|start)(?: the)? (?:app|application)", re.IGNORECASE), "open_app"),
+        (re.compile(r"(?:take|capture|grab)(?: a)? screen ?shot", re.IGNORECASE), "take_screenshot"),
+        (re.compile(r"wait(?: for)?(?: the)? .*?(?:screen|page)(?: to (?:load|appear))?", re.IGNORECASE), "wait_for_screen"),
+        # A quoted query is taken whole; an unquoted one must not run into a second clause, which
+        # leaves instructions like "search for milk and add it to the cart" to the next tier
+        (re.compile(r"search(?: for)? (?P<query>'[^']+'|\"[^\"]+\"|(?:(?! (?:and|then)\b)[^,;:.!?])+)", re.IGNORECASE),
+         "search"),
+    ]
+
+    def resolve(self, instruction: str) -> Dict[str, Any] | None:
+        text = re.sub(r"\s+", " ", instruction).strip().rstrip(".!")
+
+        for pattern, action_name in self.rules:
+            match = pattern.fullmatch(text)
+            if match:
+                arguments = {key: value.strip().strip("'\"") for key, value in match.groupdict().items()}
+                return {"name": action_name, "arguments": arguments}
+
+        return None
+
+
+class CacheTier:
+    """Actions previously resolved by the remote LLM, read from the persistent cache."""
+
+    name = "cache"
+    trusted = False
+
+    def resolve(self, instruction: str) -> Dict[str, Any] | None:
+        cache = LLMAutomation.get_cache()
+        if cache is None:
+            return None
+
+        return cache.get(instruction, LLMAutomation.model, catalogue_fingerprint(action_handlers))
+
+
+class LocalModelTier:
+    """Offline nearest-neighbour parser trained on the bundled dataset."""
+
+    name = "local"
+    trusted = False
+
+    def __init__(self, min_score: float = None):
+        self.min_score = min_score
+
+    def resolve(self, instruction: str) -> Dict[str, Any] | None:
+        return LocalIntentParser.default().parse(instruction, min_score=self.min_score)
+
+
+class LLMTier:
+    """Remote LLM; answers are stored in the cache for the cache tier."""
+
+    name = "llm"
+    trusted = True
+
+    def resolve(self, instruction: str) -> Dict[str, Any] | None:
+        # The cache tier has already been consulted, so only write the answer back
+        return LLMAutomation.call_llm(instruction, check_cache=False)
+
+
+class InstructionResolver:
+    """Try each tier in order and return the first usable action, recording who answered and how fast."""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, tiers: list):
+        self.tiers = tiers
+
+    @classmethod
+    def for_backend(cls, backend: str) -> "InstructionResolver":
+        if backend == "local":
+            return cls([RuleTier(), LocalModelTier()])
+
+        if backend == "auto":
+            return cls([RuleTier(), CacheTier(), LocalModelTier(Config.LOCAL_PARSER_AUTO_MIN_SCORE), LLMTier()])
+
+        return cls([RuleTier(), CacheTier(), LLMTier()])
+
+    @classmethod
+    def default(cls) -> "InstructionResolver":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls.for_backend(Config.PARSER_BACKEND)
+
+        return cls._default
+
+    @staticmethod
+    def usable(action: Dict[str, Any]) -> bool:
+        """A known action with every required param filled in, so running it does more than a no-op."""
+        handler = action_handlers.get(action.get("name"))
+        return handler is not None and handler.accepts(action.get("arguments"))
+
+    def resolve(self, instruction: str) -> Resolution:
+        resolution = Resolution(instruction=instruction)
+        started = time.perf_counter()
+
+        for tier in self.tiers:
+            tier_started = time.perf_counter()
+            try:
+                action = tier.resolve(instruction)
+            except Exception as e:
+                print(f"Resolver tier '{tier.name}' failed for '{instruction}': {e}")
+                action = None
+
+            resolution.attempts.append((tier.name, time.perf_counter() - tier_started))
+
+            if action and (tier.trusted or self.usable(action)):
+                resolution.action = action
+                resolution.tier = tier.name
+                break
+
+        resolution.elapsed = time.perf_counter() - started
+        return resolution
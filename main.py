@@ -1,11 +1,11 @@
-import time
 from typing import Any
 import streamlit as st
+from components.locator_store import LocatorStore
 from device_manager.connected_devices import get_all_devices_info
-from device_manager.installed_apps import find_app_by_name
-from llm.function_calling import action_handlers
-from utils.appium_manager import AppiumAppManager
 from llm.parser import LLMAutomation
+from runner.executor import MultiDeviceExecutor
+from utils.config import Config
+from utils.session_pool import SessionPool
 
 
 def main():
@@ -21,6 +21,10 @@ def main():
         st.error("No devices connected for Debugging")
         return
 
+    # Open Appium sessions in the background so the first Debug click does not pay for them
+    if Config.SESSION_POOL_ENABLED and Config.SESSION_POOL_PREWARM:
+        prewarm_sessions(devices, app_name)
+
     # Create device selection dropdown
     device_options = ["All Devices"] + [f"{device.device_name} ({device.device_id})" for device in devices]
     selected_device = st.selectbox("Select Device:", device_options)
@@ -37,76 +41,99 @@ def main():
 
     # Debug button
     if st.button("Debug"):
-        # Create a status container
-        status = st.empty()
-
         if selected_device == "All Devices":
             # Run on all devices
-            for device in devices:
-                run_debug_for_device(device, app_name, instructions, status)
+            target_devices = devices
         else:
             # Run on selected device
             selected_device_id = selected_device.split('(')[-1].rstrip(')')
-            selected_device_obj = next((d for d in devices if d.device_id == selected_device_id), None)
-            if selected_device_obj:
-                run_debug_for_device(selected_device_obj, app_name, instructions, status)
-
-
-def run_debug_for_device(device, app_name: str, instructions: list, status: Any):
-    """Run debug process for a specific device"""
-    status.info(f"📱 Running on device: {device.device_id}")
-
-    package_name = find_app_by_name(app_name, device_id=device.device_id)
-    if not package_name:
-        status.error(f"{app_name} is probably not installed on {device.device_name}")
-        return
+            target_devices = [d for d in devices if d.device_id == selected_device_id]
 
-    manager = AppiumAppManager(
-        app_package=package_name,
-        app_activity=".MainActivity",
-        device_id=device.device_id,
-        platform_version=device.platform_version
-    )
-
-    try:
-        manager.manage_state()
-
-        # Create columns for progress and status
-        progress_bar = st.progress(0)
+        if target_devices:
+            run_debug(target_devices, app_name, instructions)
 
-        for idx, instruction in enumerate(instructions):
-            # Update progress
-            progress = (idx + 1) / len(instructions)
-            progress_bar.progress(progress)
-
-            status.info(f"Executing instruction: {instruction}")
 
-            action = LLMAutomation.call_llm(instruction)
-            if action:
-                action_type = action.get("name")
-                action_args = action.get("arguments")
+def prewarm_sessions(devices: list, app_name: str):
+    """Start a pooled Appium session for the app on every connected device that has it installed.
 
-                handler = action_handlers.get(action_type)
-                if handler:
-                    status.info(f"Executing action type: {action_type}")
-                    handler.function(manager).execute(**action_args)
+    Called on every rerun; the pool does the app lookups in the background, once per device and app.
+    """
+    for device in devices:
+        SessionPool.default().prewarm_app(device.device_id, app_name, device.platform_version)
 
-                else:
-                    status.warning(f"No handler defined for action type: {action_type}")
-            else:
-                status.error("Failed to detect home screen.")
 
-            # Add a small delay to make the progress visible
-            time.sleep(0.5)
+def run_debug(devices: list, app_name: str, instructions: list):
+    """Run the debug process on every device concurrently and show per-device progress"""
+    panels = {}
+    for device in devices:
+        st.subheader(f"{device.device_name} ({device.device_id})")
+        panels[device.device_id] = (st.empty(), st.progress(0))
 
-        status.success("Debug process completed successfully!")
+    def on_event(device_id: str, level: str, message: str, progress: Any):
+        status, progress_bar = panels[device_id]
+        getattr(status, level)(message)
 
-    except Exception as e:
-        status.error(f"Error during debug process: {str(e)}")
+        if progress is not None:
+            progress_bar.progress(progress)
 
-    finally:
-        manager.quit()
+    result = MultiDeviceExecutor().run(devices, app_name, instructions, on_event=on_event)
+
+    if result.passed:
+        st.success(f"Debug process completed: {result.summary()}")
+    else:
+        st.error(f"Debug process finished with failures: {result.summary()}")
+
+    st.table([
+        {
+            "Device": f"{device.device_name} ({device.device_id})",
+            "Status": device.status,
+            "Steps passed": f"{sum(1 for step in device.steps if step.status == 'passed')}/{len(device.steps)}",
+            "Duration (s)": round(device.duration, 2),
+            "Error": device.error or "",
+        }
+        for device in result.devices
+    ])
+
+    st.table([
+        {
+            "Instruction": step.instruction,
+            "Action": step.action.get("name") if step.action else "",
+            "Resolved by": step.tier or "unresolved",
+            "Resolve time (ms)": round(step.elapsed * 1000, 2),
+        }
+        for step in result.plan
+    ])
+
+    breakdown_rows = [
+        {
+            "Device": device.device_id,
+            "Instruction": step.instruction,
+            "Total (ms)": round(step.duration * 1000, 1),
+            **{f"{category.capitalize()} (ms)": round(seconds * 1000, 1) for category, seconds in step.breakdown.items()},
+        }
+        for device in result.devices
+        for step in device.steps
+        if step.breakdown
+    ]
+    if breakdown_rows:
+        st.subheader("Step latency breakdown")
+        st.table(breakdown_rows)
+
+    if result.trace_path:
+        st.caption(f"Trace written to {result.trace_path} (open in chrome://tracing or ui.perfetto.dev)")
+
+    cache = LLMAutomation.get_cache()
+    if cache is not None:
+        stats = cache.stats()
+        st.caption(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses "
+                   f"({stats['hit_rate']:.0%} hit rate), {stats['entries']} entries stored")
+
+    locator_store = LocatorStore.default()
+    if locator_store is not None:
+        for package, stats in locator_store.stats().items():
+            st.caption(f"Locator store ({package}): {stats['hits']} hits, {stats['misses']} misses "
+                       f"({stats['hit_rate']:.0%} hit rate)")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
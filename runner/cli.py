@@ -0,0 +1,261 @@
+"""Headless batch runner for CI.
+
+    python -m runner.cli suite.json [--output results.json] [--max-parallel N] [--record] [--replay] [--shard]
+    python -m runner.cli --list-devices
+
+A suite file holds one or more scenarios; top-level keys are defaults for every scenario:
+
+    {
+        "app": "Zepto",
+        "devices": ["emulator-*", "Pixel 7"],
+        "scenarios": [
+            {"name": "search", "instructions": ["Open the app", "Search for milk"]},
+            {"name": "screenshot", "app": "Chrome", "instructions": ["Take a screenshot"]}
+        ]
+    }
+
+A suite without "scenarios" is a single scenario. Device selectors are shell-style patterns matched
+against the serial and the model name; they default to every connected device.
+
+--shard runs each scenario once, on one device, instead of on every matching device: scenarios are
+spread over the pool by device speed, an optional "min_platform_version" limits which devices can
+take one, and a failed scenario is retried on another device. The results report the makespan.
+
+--record compiles every passing scenario into a replay script (resolved actions and element
+locators) under Config.REPLAY_DIR. --replay runs a scenario from its script when one exists for the
+same app and instructions: no LLM calls, and stored locators are tried before discovery.
+
+Exit codes: 0 when every step passed on every device, 1 when anything failed, 2 for an invalid suite
+or when no device matches.
+"""
+import argparse
+import contextlib
+import json
+import sys
+import time
+
+EXIT_PASSED = 0
+EXIT_FAILED = 1
+EXIT_ERROR = 2
+
+
+class SuiteError(Exception):
+    """The suite file is missing, malformed or cannot be run on the connected devices."""
+
+
+def load_suite(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as file:
+            suite = json.load(file)
+    except (OSError, json.JSONDecodeError) as e:
+        raise SuiteError(f"Could not read suite {path}: {e}") from e
+
+    if not isinstance(suite, dict):
+        raise SuiteError("A suite must be a JSON object")
+
+    defaults = {key: value for key, value in suite.items() if key != "scenarios"}
+    scenarios = suite.get("scenarios") or [{}]
+    if not isinstance(scenarios, list):
+        raise SuiteError("'scenarios' must be a list of objects")
+
+    resolved = []
+    for index, scenario in enumerate(scenarios):
+        if not isinstance(scenario, dict):
+            raise SuiteError(f"scenario {index + 1} must be a JSON object, got {scenario!r}")
+
+        scenario = {**defaults, **scenario}
+        scenario.setdefault("name", f"scenario-{index + 1}")
+        scenario.setdefault("devices", ["*"])
+
+        if not scenario.get("app"):
+            raise SuiteError(f"{scenario['name']}: 'app' is required")
+        instructions = scenario.get("instructions")
+        if (not isinstance(instructions, list) or not instructions
+                or not all(isinstance(line, str) and line.strip() for line in instructions)):
+            raise SuiteError(f"{scenario['name']}: 'instructions' must be a non-empty list of non-empty strings")
+        if isinstance(scenario["devices"], str):
+            scenario["devices"] = [scenario["devices"]]
+
+        resolved.append(scenario)
+
+    return {"name": suite.get("name", path), "scenarios": resolved}
+
+
+def select_devices(devices: list, selectors: list) -> list:
+    from runner.scheduler import device_matches
+
+    return [device for device in devices if device_matches(device, selectors)]
+
+
+def device_passed(device) -> bool:
+    """Stricter than the playground: an instruction that could not be interpreted fails the device."""
+    return device.passed and all(step.status == "passed" for step in device.steps)
+
+
+def scenario_report(scenario: dict, result, replayed: bool = False) -> dict:
+    from dataclasses import asdict
+
+    passed = sum(1 for device in result.devices if device_passed(device))
+    return {
+        "name": scenario["name"],
+        "app": scenario["app"],
+        "replayed": replayed,
+        "passed": bool(result.devices) and passed == len(result.devices),
+        "summary": f"{passed}/{len(result.devices)} devices passed in {result.duration:.1f}s",
+        "duration": round(result.duration, 3),
+        "devices": [asdict(device) for device in result.devices],
+        "plan": [asdict(step) for step in result.plan],
+    }
+
+
+def run_suite(suite: dict, max_parallel: int = None, on_event=None, record: bool = False, replay: bool = False,
+              replay_dir: str = None, shard: bool = False) -> dict:
+    # Heavy imports (appium, selenium, the LLM client) are only paid for when a suite actually runs
+    from device_manager.connected_devices import get_all_devices_info
+    from runner.executor import MultiDeviceExecutor
+    from runner.replay import compile_run, load_replay, replay_path
+
+    connected = get_all_devices_info() or []
+    started = time.perf_counter()
+
+    def run_scenario(scenario: dict, devices: list) -> dict:
+        path = replay_path(f"{suite['name']}-{scenario['name']}", replay_dir)
+        script = load_replay(path, scenario["app"], scenario["instructions"]) if replay else None
+
+        executor = MultiDeviceExecutor(max_workers=max_parallel or scenario.get("max_parallel"))
+        result = executor.run(devices, scenario["app"], scenario["instructions"], on_event=on_event,
+                              plan=script.to_plan() if script else None)
+        report = scenario_report(scenario, result, replayed=script is not None)
+
+        # Re-recording after a replay keeps locators that had to be rediscovered
+        if record and report["passed"]:
+            compiled = compile_run(scenario["app"], scenario["instructions"], result)
+            if compiled is not None:
+                report["replay_path"] = compiled.save(path)
+
+        return report
+
+    if shard:
+        return run_sharded(suite, connected, run_scenario, started)
+
+    reports = []
+    for scenario in suite["scenarios"]:
+        devices = select_devices(connected, scenario["devices"])
+        if not devices:
+            raise SuiteError(f"{scenario['name']}: no connected device matches {scenario['devices']}")
+
+        reports.append(run_scenario(scenario, devices))
+
+    return {
+        "suite": suite["name"],
+        "passed": all(report["passed"] for report in reports),
+        "duration": round(time.perf_counter() - started, 3),
+        "scenarios": reports,
+    }
+
+
+def run_sharded(suite: dict, connected: list, run_scenario, started: float = None) -> dict:
+    """Run each scenario once on one of `connected`; run_scenario(scenario, [device]) returns its report."""
+    from runner.scheduler import SuiteScheduler
+
+    started = time.perf_counter() if started is None else started
+    if not connected:
+        raise SuiteError("no device connected")
+
+    scheduler = SuiteScheduler(connected, run_shard=lambda device, scenario: run_scenario(scenario, [device]))
+    schedule = scheduler.run(suite["scenarios"])
+
+    reports = []
+    for shard in schedule.shards:
+        last = shard.reports[-1] if shard.reports else {"passed": False}
+        # An attempt that raised (or a dropped worker) only reports "passed" and "error"
+        report = {
+            "name": shard.scenario["name"],
+            "app": shard.scenario["app"],
+            "summary": last.get("error") or shard.error,
+            "devices": [],
+            **last,
+        }
+        report["attempts"] = shard.attempts
+        if shard.error:
+            report["error"] = shard.error
+        reports.append(report)
+
+    return {
+        "suite": suite["name"],
+        "passed": schedule.passed,
+        "duration": round(time.perf_counter() - started, 3),
+        "makespan": round(schedule.makespan, 3),
+        "devices": schedule.device_report(scheduler.speeds),
+        "scenarios": reports,
+    }
+
+
+def print_event(device_id: str, level: str, message: str, progress=None) -> None:
+    print(f"[{device_id}] {level.upper()}: {message}", file=sys.stderr)
+
+
+def list_devices() -> int:
+    from device_manager.adb_client import AdbError, adb_devices
+    from device_manager.connected_devices import get_all_devices_info
+
+    # Device discovery swallows adb errors; an unreachable adb is not the same as "no devices"
+    try:
+        adb_devices()
+    except AdbError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    for device in get_all_devices_info() or []:
+        print(f"{device.device_id}\t{device.device_name}\tAndroid {device.platform_version}")
+
+    return EXIT_PASSED
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("suite", nargs="?", help="path to the suite JSON file")
+    parser.add_argument("--output", "-o", help="write JSON results here instead of stdout")
+    parser.add_argument("--max-parallel", type=int, help="devices run concurrently per scenario")
+    parser.add_argument("--quiet", "-q", action="store_true", help="do not print progress events")
+    parser.add_argument("--list-devices", action="store_true", help="print connected devices and exit")
+    parser.add_argument("--record", action="store_true", help="save passing scenarios as replay scripts")
+    parser.add_argument("--replay", action="store_true", help="run scenarios from their replay scripts")
+    parser.add_argument("--replay-dir", help="where replay scripts are kept (default: Config.REPLAY_DIR)")
+    parser.add_argument("--shard", action="store_true", help="run each scenario once, spread over the devices")
+    args = parser.parse_args(argv)
+
+    if args.list_devices:
+        return list_devices()
+
+    if not args.suite:
+        parser.error("a suite file is required")
+
+    try:
+        suite = load_suite(args.suite)
+        # Actions print their progress; keep stdout clean for the JSON results
+        with contextlib.redirect_stdout(sys.stderr):
+            results = run_suite(suite, args.max_parallel, on_event=None if args.quiet else print_event,
+                                record=args.record, replay=args.replay, replay_dir=args.replay_dir,
+                                shard=args.shard)
+    except SuiteError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    for scenario in results["scenarios"]:
+        print(f"{'PASS' if scenario['passed'] else 'FAIL'} {scenario['name']}: {scenario['summary']}", file=sys.stderr)
+    if "makespan" in results:
+        print(f"Makespan {results['makespan']:.1f}s over {len(results['devices'])} devices", file=sys.stderr)
+
+    return EXIT_PASSED if results["passed"] else EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
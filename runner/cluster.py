@@ -0,0 +1,437 @@
+"""Multi-node runs: worker hosts advertise their devices and Appium servers, a coordinator shards a suite over all of them.
+
+    python -m runner.cluster coordinator suite.json [--listen 127.0.0.1:7700] [--workers 2] [--output results.json]
+    python -m runner.cluster worker [--coordinator 127.0.0.1:7700] [--name host-a] [--driver-url SERIAL=URL ...]
+
+Workers dial in to the coordinator, which waits for --workers of them (or --wait seconds), then
+schedules scenarios as `runner.cli --shard` does: each scenario runs once, on one device of any
+worker. The protocol is one JSON object per line over TCP:
+
+    worker -> coordinator   {"type": "hello", "worker": "host-a", "devices": [{"serial", "device_name", "platform_version", "driver_url"}]}
+    coordinator -> worker   {"type": "run", "job": 1, "serial": "emulator-5554", "scenario": {...}}
+    worker -> coordinator   {"type": "event", "job": 1, "level": "info", "message": "...", "progress": 0.5}
+    worker -> coordinator   {"type": "result", "job": 1, "report": {...}}
+    coordinator -> worker   {"type": "shutdown"}
+
+Devices are named "<worker>/<serial>" on the coordinator, so selectors look like "*/emulator-*" or
+match the model name. `worker --fake N` serves N fake devices (benchmarks.fakes) with a fake LLM
+endpoint, for trying a cluster out on one machine.
+"""
+import argparse
+import contextlib
+import itertools
+import json
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from utils.config import Config
+
+EXIT_ERROR = 2
+
+
+class ClusterError(Exception):
+    """A worker or the coordinator went away, or sent something that is not part of the protocol."""
+
+
+class Connection:
+    """JSON lines over a socket; send() may be called from several threads."""
+
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._reader = sock.makefile("r", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def send(self, message: dict) -> None:
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self._lock:
+            self.sock.sendall(data)
+
+    def receive(self) -> Optional[dict]:
+        """The next message, or None once the other side has closed the connection."""
+        try:
+            line = self._reader.readline()
+        except OSError:
+            return None
+
+        if not line:
+            return None
+
+        try:
+            return json.loads(line)
+        except ValueError as e:
+            raise ClusterError(f"Malformed message: {line[:200]!r}") from e
+
+    def close(self) -> None:
+        with contextlib.suppress(OSError):
+            self.sock.shutdown(socket.SHUT_RDWR)
+        self.sock.close()
+
+
+def parse_address(address: str) -> tuple:
+    host, _, port = address.rpartition(":")
+    return host or Config.CLUSTER_HOST, int(port)
+
+
+@dataclass(eq=False)
+class RemoteDevice:
+    device_id: str
+    device_name: str
+    platform_version: str
+    serial: str
+    driver_url: Optional[str]
+    worker: "WorkerLink"
+
+
+class WorkerLink:
+    """The coordinator's end of one worker connection: sends jobs and resolves them as results stream back."""
+
+    def __init__(self, name: str, connection: Connection, devices: List[dict], on_event=None):
+        self.name = name
+        self.connection = connection
+        self.on_event = on_event
+        self.alive = True
+        self.devices = [
+            RemoteDevice(
+                device_id=f"{name}/{device['serial']}",
+                device_name=device.get("device_name") or device["serial"],
+                platform_version=str(device.get("platform_version") or ""),
+                serial=device["serial"],
+                driver_url=device.get("driver_url"),
+                worker=self,
+            )
+            for device in devices
+        ]
+
+        self._jobs: Dict[int, tuple] = {}
+        self._job_ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, name=f"cluster-{name}", daemon=True)
+        self._reader.start()
+
+    def run(self, device: RemoteDevice, scenario: dict) -> dict:
+        """Run a scenario on one of this worker's devices and wait for its report."""
+        future = Future()
+        with self._lock:
+            if not self.alive:
+                raise ClusterError(f"Worker {self.name} is gone")
+
+            job = next(self._job_ids)
+            self._jobs[job] = (device, future)
+
+        try:
+            self.connection.send({"type": "run", "job": job, "serial": device.serial, "scenario": scenario})
+        except OSError as e:
+            self._lost(f"Could not reach worker {self.name}: {e}")
+
+        report = future.result()
+        report["worker"] = self.name
+        return report
+
+    def _read(self) -> None:
+        try:
+            while True:
+                message = self.connection.receive()
+                if message is None:
+                    break
+
+                kind = message.get("type")
+                with self._lock:
+                    device, future = self._jobs.get(message.get("job"), (None, None))
+
+                if kind == "event" and device is not None and self.on_event:
+                    self.on_event(device.device_id, message.get("level", "info"), message.get("message", ""),
+                                  message.get("progress"))
+                elif kind == "result" and future is not None:
+                    with self._lock:
+                        self._jobs.pop(message["job"], None)
+                    future.set_result(message.get("report") or {"passed": False})
+
+        except ClusterError as e:
+            print(f"Dropping worker {self.name}: {e}")
+
+        self._lost(f"Worker {self.name} disconnected")
+
+    def _lost(self, reason: str) -> None:
+        with self._lock:
+            self.alive = False
+            jobs, self._jobs = self._jobs, {}
+
+        # The scheduler sees the failed shard and retries it on a device of another worker
+        for _, future in jobs.values():
+            if not future.done():
+                future.set_exception(ClusterError(reason))
+
+    def shutdown(self) -> None:
+        with contextlib.suppress(OSError):
+            self.connection.send({"type": "shutdown"})
+        self.connection.close()
+
+
+class Coordinator:
+    """Accepts worker connections and shards suites over their devices."""
+
+    def __init__(self, host: str = None, port: int = None, on_event=None):
+        self.on_event = on_event
+        self.workers: List[WorkerLink] = []
+        self._condition = threading.Condition()
+
+        self._server = socket.create_server((host or Config.CLUSTER_HOST, Config.CLUSTER_PORT if port is None else port))
+        self._closed = False
+        threading.Thread(target=self._accept, name="cluster-accept", daemon=True).start()
+
+    @property
+    def address(self) -> tuple:
+        return self._server.getsockname()[:2]
+
+    def _accept(self) -> None:
+        while not self._closed:
+            try:
+                sock, _ = self._server.accept()
+            except OSError:
+                return
+
+            threading.Thread(target=self._handshake, args=(sock,), daemon=True).start()
+
+    def _handshake(self, sock: socket.socket) -> None:
+        connection = Connection(sock)
+        try:
+            sock.settimeout(Config.CLUSTER_CONNECT_TIMEOUT)
+            hello = connection.receive()
+            sock.settimeout(None)
+            if not hello or hello.get("type") != "hello":
+                raise ClusterError(f"Expected a hello, got {hello!r}")
+        except (OSError, ClusterError) as e:
+            print(f"Rejected worker connection: {e}")
+            connection.close()
+            return
+
+        with self._condition:
+            name = hello.get("worker") or f"worker-{len(self.workers) + 1}"
+            if any(worker.name == name for worker in self.workers):
+                name = f"{name}-{len(self.workers) + 1}"
+
+            self.workers.append(WorkerLink(name, connection, hello.get("devices") or [], self.on_event))
+            self._condition.notify_all()
+
+        print(f"Worker {name} joined with {len(hello.get('devices') or [])} devices")
+
+    def wait_for_workers(self, count: int, timeout: float) -> List[WorkerLink]:
+        """Block until `count` workers have joined or `timeout` seconds passed; returns the workers so far."""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while len(self.workers) < count and time.monotonic() < deadline:
+                self._condition.wait(timeout=deadline - time.monotonic())
+
+            return list(self.workers)
+
+    def devices(self) -> List[RemoteDevice]:
+        with self._condition:
+            return [device for worker in self.workers if worker.alive for device in worker.devices]
+
+    def run_suite(self, suite: dict) -> dict:
+        from runner.cli import SuiteError, run_sharded
+
+        devices = self.devices()
+        if not devices:
+            raise SuiteError("no worker with devices joined the cluster")
+
+        return run_sharded(suite, devices, lambda scenario, targets: targets[0].worker.run(targets[0], scenario))
+
+    def close(self) -> None:
+        self._closed = True
+        with self._condition:
+            workers = list(self.workers)
+
+        for worker in workers:
+            worker.shutdown()
+        self._server.close()
+
+
+class Worker:
+    """Serves this host's devices to a coordinator, one job per device at a time."""
+
+    def __init__(self, name: str, devices: list):
+        self.name = name
+        self.devices = {device.device_id: device for device in devices}
+
+    def hello(self) -> dict:
+        from utils.driver_factory import driver_url_for
+
+        return {
+            "type": "hello",
+            "worker": self.name,
+            "devices": [
+                {"serial": device.device_id, "device_name": device.device_name,
+                 "platform_version": device.platform_version, "driver_url": driver_url_for(device.device_id)}
+                for device in self.devices.values()
+            ],
+        }
+
+    def serve(self, host: str, port: int, connect_timeout: float = None) -> None:
+        """Connect to the coordinator and run jobs until it shuts the worker down or goes away."""
+        connection = Connection(self._connect(host, port, connect_timeout or Config.CLUSTER_CONNECT_TIMEOUT))
+        connection.send(self.hello())
+
+        with ThreadPoolExecutor(max_workers=max(len(self.devices), 1), thread_name_prefix="cluster-job") as pool:
+            while True:
+                message = connection.receive()
+                if message is None or message.get("type") == "shutdown":
+                    break
+
+                if message.get("type") == "run":
+                    pool.submit(self._run_job, connection, message)
+
+        connection.close()
+
+    @staticmethod
+    def _connect(host: str, port: int, timeout: float) -> socket.socket:
+        # Workers may be started before the coordinator
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                sock = socket.create_connection((host, port), timeout=5)
+                sock.settimeout(None)
+                return sock
+            except OSError as e:
+                if time.monotonic() >= deadline:
+                    raise ClusterError(f"Could not reach the coordinator at {host}:{port}: {e}") from e
+                time.sleep(0.5)
+
+    def _run_job(self, connection: Connection, message: dict) -> None:
+        from runner.cli import scenario_report
+        from runner.executor import MultiDeviceExecutor
+
+        job = message.get("job")
+        scenario = message.get("scenario") or {}
+
+        def send_event(device_id, level, text, progress=None):
+            with contextlib.suppress(OSError):
+                connection.send({"type": "event", "job": job, "level": level, "message": text, "progress": progress})
+
+        try:
+            device = self.devices.get(message.get("serial"))
+            if device is None:
+                raise ClusterError(f"{self.name} has no device {message.get('serial')}")
+
+            result = MultiDeviceExecutor(max_workers=1).run([device], scenario["app"], scenario["instructions"],
+                                                            on_event=send_event)
+            report = scenario_report(scenario, result)
+
+        except Exception as e:
+            report = {"name": scenario.get("name"), "app": scenario.get("app"), "passed": False,
+                      "summary": f"Worker error: {e}", "error": str(e), "devices": []}
+
+        with contextlib.suppress(OSError):
+            connection.send({"type": "result", "job": job, "report": report})
+
+
+def fake_devices(count: int) -> list:
+    from device_manager.connected_devices import DeviceInfo
+
+    return [DeviceInfo(f"Fake {index}", "14", f"fake-{index}") for index in range(count)]
+
+
+def run_coordinator(args) -> int:
+    from runner.cli import EXIT_FAILED, EXIT_PASSED, SuiteError, load_suite, print_event
+
+    try:
+        suite = load_suite(args.suite)
+    except SuiteError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+    host, port = parse_address(args.listen)
+    coordinator = Coordinator(host, port, on_event=None if args.quiet else print_event)
+    print(f"Coordinator listening on {host}:{coordinator.address[1]}", file=sys.stderr)
+
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            coordinator.wait_for_workers(args.workers, args.wait)
+            results = coordinator.run_suite(suite)
+    except SuiteError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    finally:
+        coordinator.close()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+
+    for scenario in results["scenarios"]:
+        where = f" on {scenario['worker']}" if scenario.get("worker") else ""
+        print(f"{'PASS' if scenario['passed'] else 'FAIL'} {scenario['name']}{where}: {scenario['summary']}",
+              file=sys.stderr)
+    print(f"Makespan {results['makespan']:.1f}s over {len(results['devices'])} devices", file=sys.stderr)
+
+    return EXIT_PASSED if results["passed"] else EXIT_FAILED
+
+
+def run_worker(args) -> int:
+    from runner.cli import EXIT_PASSED
+
+    for item in args.driver_url or []:
+        serial, _, url = item.rpartition("=")
+        if serial:
+            Config.DRIVER_URLS[serial] = url
+        else:
+            Config.DRIVER_URL = url
+
+    host, port = parse_address(args.coordinator)
+    name = args.name or socket.gethostname()
+
+    if args.fake:
+        from benchmarks.fakes import fake_environment
+
+        with fake_environment():
+            Worker(name, fake_devices(args.fake)).serve(host, port)
+        return EXIT_PASSED
+
+    from device_manager.connected_devices import get_all_devices_info
+
+    devices = get_all_devices_info() or []
+    if not devices:
+        print("No devices connected; nothing to serve.", file=sys.stderr)
+        return EXIT_ERROR
+
+    Worker(name, devices).serve(host, port)
+    return EXIT_PASSED
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    coordinator = commands.add_parser("coordinator", help="accept workers and run a suite on their devices")
+    coordinator.add_argument("suite", help="path to the suite JSON file")
+    coordinator.add_argument("--listen", default=f"{Config.CLUSTER_HOST}:{Config.CLUSTER_PORT}")
+    coordinator.add_argument("--workers", type=int, default=1, help="workers to wait for before starting")
+    coordinator.add_argument("--wait", type=float, default=Config.CLUSTER_CONNECT_TIMEOUT,
+                             help="seconds to wait for the workers")
+    coordinator.add_argument("--output", "-o", help="write JSON results here instead of stdout")
+    coordinator.add_argument("--quiet", "-q", action="store_true", help="do not print progress events")
+
+    worker = commands.add_parser("worker", help="serve this host's devices to a coordinator")
+    worker.add_argument("--coordinator", default=f"{Config.CLUSTER_HOST}:{Config.CLUSTER_PORT}")
+    worker.add_argument("--name", help="worker name, defaults to the host name")
+    worker.add_argument("--driver-url", action="append", metavar="[SERIAL=]URL",
+                        help="Appium server for one device, or for all devices without SERIAL=")
+    worker.add_argument("--fake", type=int, metavar="N", help="serve N fake devices instead of real ones")
+
+    args = parser.parse_args(argv)
+    try:
+        return run_coordinator(args) if args.command == "coordinator" else run_worker(args)
+    except ClusterError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+
+if __name__ == "__main__":
+    sys.exit(main())
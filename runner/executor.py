@@ -0,0 +1,107 @@
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional
+from llm.planner import PlanStream, PlannedStep, plan_instructions
+from runner.session import DeviceRunResult, run_device_session
+from utils.config import Config
+from utils.tracing import Tracer, breakdown, export_chrome_trace, submit_in_context
+
+# on_event(device_id, level, message, progress) is always invoked on the thread that called run()
+EventHandler = Callable[[str, str, str, Optional[float]], None]
+
+
+@dataclass
+class RunResult:
+    devices: List[DeviceRunResult] = field(default_factory=list)
+    plan: List[PlannedStep] = field(default_factory=list)
+    duration: float = 0.0
+    trace_path: Optional[str] = None
+
+    @property
+    def passed(self) -> bool:
+        return bool(self.devices) and all(device.passed for device in self.devices)
+
+    def summary(self) -> str:
+        passed = sum(1 for device in self.devices if device.passed)
+        return f"{passed}/{len(self.devices)} devices passed in {self.duration:.1f}s"
+
+
+class MultiDeviceExecutor:
+    """Run one device session per worker, with at most `max_workers` sessions in flight."""
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or Config.MAX_PARALLEL_DEVICES
+
+    def run(self, devices: list, app_name: str, instructions: list, on_event: EventHandler = None,
+            plan: List[PlannedStep] = None) -> RunResult:
+        """Run the instructions on every device; a precomputed `plan` (e.g. from a replay) skips resolution."""
+        with Tracer.default().recording() as spans:
+            result = self._run(devices, app_name, instructions, on_event, plan)
+
+        for device in result.devices:
+            for idx, step in enumerate(device.steps):
+                step.breakdown = breakdown(spans, device_id=device.device_id, step=idx)
+
+        if Config.TRACE_EXPORT and spans:
+            try:
+                result.trace_path = export_chrome_trace(spans)
+            except OSError as e:
+                print(f"Could not write trace file: {e}")
+
+        return result
+
+    def _run(self, devices: list, app_name: str, instructions: list, on_event: EventHandler = None,
+             plan: List[PlannedStep] = None) -> RunResult:
+        events = queue.Queue()
+        started = time.perf_counter()
+
+        # Instructions are translated once and the resulting plan is shared by every device. Pipelined,
+        # devices start their sessions and first steps while later instructions are still being resolved
+        stream = None
+        if plan is None and Config.PIPELINE_ENABLED and devices:
+            plan = stream = PlanStream(instructions, consumers=len(devices))
+        elif plan is None:
+            plan = plan_instructions(instructions)
+
+        def make_reporter(device_id):
+            def report(level, message, progress=None):
+                events.put((device_id, level, message, progress))
+            return report
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(devices)) or 1) as pool:
+            futures = [
+                submit_in_context(pool, run_device_session, device, app_name, plan, make_reporter(device.device_id))
+                for device in devices
+            ]
+            if stream is not None:
+                for future in futures:
+                    future.add_done_callback(lambda _: stream.release())
+
+            # Drain worker events on this thread so UI callbacks never run inside a worker
+            while not all(future.done() for future in futures) or not events.empty():
+                try:
+                    event = events.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+
+                if on_event:
+                    on_event(*event)
+
+        results = []
+        for device, future in zip(devices, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(DeviceRunResult(
+                    device_id=device.device_id,
+                    device_name=device.device_name,
+                    status="failed",
+                    error=str(e)
+                ))
+
+        if stream is not None:
+            plan = stream.steps()
+
+        return RunResult(devices=results, plan=plan, duration=time.perf_counter() - started)
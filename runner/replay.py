@@ -0,0 +1,112 @@
+import datetime
+import hashlib
+import json
+import os
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+from llm.planner import PlannedStep
+from utils.config import Config
+
+REPLAY_FORMAT = 1
+
+
+@dataclass
+class ReplayStep:
+    instruction: str
+    action: Optional[Dict[str, Any]] = None
+    locators: Dict[str, str] = field(default_factory=dict)
+    # how long the step took when it was recorded, for comparing replays against the original run
+    duration: float = 0.0
+
+
+@dataclass
+class ReplayScript:
+    """A passing run compiled down to resolved actions and element locators, replayable without the LLM."""
+
+    app_name: str
+    instructions_key: str
+    steps: List[ReplayStep] = field(default_factory=list)
+    recorded_on: Optional[str] = None
+    created_at: str = field(default_factory=lambda: datetime.datetime.now().isoformat(timespec="seconds"))
+    format: int = REPLAY_FORMAT
+
+    @staticmethod
+    def key_for(app_name: str, instructions: List[str]) -> str:
+        """Identifies the suite a script was recorded for; a changed instruction list invalidates it."""
+        payload = json.dumps([app_name.strip().lower(), [line.strip() for line in instructions]])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def matches(self, app_name: str, instructions: List[str]) -> bool:
+        return self.format == REPLAY_FORMAT and self.instructions_key == self.key_for(app_name, instructions)
+
+    def to_plan(self) -> List[PlannedStep]:
+        return [
+            PlannedStep(instruction=step.instruction, action=step.action, tier="replay", locators=step.locators or None)
+            for step in self.steps
+        ]
+
+    def save(self, path: str) -> str:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(asdict(self), file, indent=2)
+
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "ReplayScript":
+        with open(path, encoding="utf-8") as file:
+            data = json.load(file)
+
+        data["steps"] = [ReplayStep(**step) for step in data.get("steps", [])]
+        return cls(**data)
+
+
+def compile_run(app_name: str, instructions: List[str], result) -> Optional[ReplayScript]:
+    """Build a replay script from a RunResult, using the first device on which every step passed."""
+    device = next(
+        (device for device in result.devices
+         if device.passed and device.steps and all(step.status == "passed" for step in device.steps)),
+        None
+    )
+    if device is None:
+        return None
+
+    steps = [
+        ReplayStep(
+            instruction=planned.instruction,
+            action=planned.action,
+            locators=dict(step.locators),
+            duration=round(step.duration, 4),
+        )
+        for planned, step in zip(result.plan, device.steps)
+    ]
+    return ReplayScript(
+        app_name=app_name,
+        instructions_key=ReplayScript.key_for(app_name, instructions),
+        steps=steps,
+        recorded_on=device.device_id,
+    )
+
+
+def replay_path(name: str, directory: str = None) -> str:
+    safe_name = re.sub(r"[^A-Za-z0-9._-]+", "_", name).strip("_") or "run"
+    return os.path.join(directory or Config.REPLAY_DIR, f"{safe_name}.replay.json")
+
+
+def load_replay(path: str, app_name: str, instructions: List[str]) -> Optional[ReplayScript]:
+    """The script at `path` if it exists and was recorded for this app and instruction list."""
+    if not os.path.exists(path):
+        return None
+
+    try:
+        script = ReplayScript.load(path)
+    except (OSError, ValueError, TypeError) as e:
+        print(f"Ignoring unreadable replay {path}: {e}")
+        return None
+
+    if not script.matches(app_name, instructions):
+        print(f"Ignoring replay {path}: it was recorded for a different app or instruction list")
+        return None
+
+    return script
@@ -0,0 +1,307 @@
+"""Shard a suite of scenarios across a device pool: each scenario runs once, on one capable device.
+
+Devices pull work as they become free. The biggest remaining scenario goes first, as long as the device
+can finish it before the pool would have drained the queue at its measured seconds per step; near the
+end a slow device only takes work no other device would finish sooner. A failed scenario is retried on
+a device that has not run it yet, and a device that keeps failing is taken out of the pool.
+"""
+import fnmatch
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+from utils.config import Config
+
+# run_shard(device, scenario) -> report dict with at least "passed"
+ShardRunner = Callable[[Any, dict], dict]
+
+
+def device_matches(device, selectors: list) -> bool:
+    """Shell-style patterns matched against the serial and the model name."""
+    return any(fnmatch.fnmatch(device.device_id, pattern) or fnmatch.fnmatch(device.device_name, pattern)
+               for pattern in selectors)
+
+
+def version_tuple(version) -> tuple:
+    return tuple(int(part) for part in re.findall(r"\d+", str(version or "")))
+
+
+def device_alive(device) -> bool:
+    """False once a remote device's worker (runner.cluster) has gone away; local devices are always alive."""
+    worker = getattr(device, "worker", None)
+    return worker is None or getattr(worker, "alive", True)
+
+
+def device_capable(device, scenario: dict) -> bool:
+    """The scenario's device selectors match and the device runs at least its min_platform_version."""
+    if not device_matches(device, scenario.get("devices") or ["*"]):
+        return False
+
+    minimum = scenario.get("min_platform_version")
+    return not minimum or version_tuple(device.platform_version) >= version_tuple(minimum)
+
+
+class SpeedModel:
+    """Seconds per step for each device, as a moving average persisted between runs."""
+
+    def __init__(self, path: str = None, smoothing: float = 0.3):
+        self.path = path or Config.DEVICE_SPEEDS_PATH
+        self.smoothing = smoothing
+        self.seconds_per_step: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as file:
+                    self.seconds_per_step = {key: float(value) for key, value in json.load(file).items()}
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"Ignoring unreadable device speeds {self.path}: {e}")
+
+    def estimate(self, device_id: str, steps: int) -> float:
+        with self._lock:
+            known = self.seconds_per_step.get(device_id)
+            if known is None:
+                # An unmeasured device is assumed to be as fast as the average measured one
+                measured = list(self.seconds_per_step.values())
+                known = sum(measured) / len(measured) if measured else Config.SCHEDULER_DEFAULT_STEP_SECONDS
+
+        return known * max(steps, 1)
+
+    def observe(self, device_id: str, steps: int, seconds: float) -> None:
+        sample = seconds / max(steps, 1)
+        with self._lock:
+            previous = self.seconds_per_step.get(device_id)
+            self.seconds_per_step[device_id] = sample if previous is None else (
+                self.smoothing * sample + (1 - self.smoothing) * previous)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+
+        with self._lock:
+            data = dict(self.seconds_per_step)
+
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as file:
+                json.dump(data, file, indent=2)
+        except OSError as e:
+            print(f"Could not save device speeds: {e}")
+
+
+@dataclass
+class Shard:
+    scenario: dict
+    attempts: List[str] = field(default_factory=list)
+    reports: List[dict] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def steps(self) -> int:
+        return len(self.scenario.get("instructions") or [])
+
+    @property
+    def passed(self) -> bool:
+        return bool(self.reports) and bool(self.reports[-1].get("passed"))
+
+
+@dataclass(eq=False)
+class DeviceSlot:
+    device: Any
+    busy_until: float = 0.0
+    busy: float = 0.0
+    shards: int = 0
+    failures: int = 0
+    quarantined: bool = False
+
+
+@dataclass
+class ScheduleResult:
+    shards: List[Shard] = field(default_factory=list)
+    slots: List[DeviceSlot] = field(default_factory=list)
+    makespan: float = 0.0
+
+    @property
+    def passed(self) -> bool:
+        return bool(self.shards) and all(shard.passed for shard in self.shards)
+
+    def device_report(self, speeds: SpeedModel = None) -> List[dict]:
+        return [
+            {
+                "device_id": slot.device.device_id,
+                "device_name": slot.device.device_name,
+                "platform_version": slot.device.platform_version,
+                "shards": slot.shards,
+                "busy": round(slot.busy, 3),
+                "utilization": round(slot.busy / self.makespan, 3) if self.makespan else 0.0,
+                "seconds_per_step": round(speeds.seconds_per_step[slot.device.device_id], 3)
+                if speeds and slot.device.device_id in speeds.seconds_per_step else None,
+                "quarantined": slot.quarantined,
+            }
+            for slot in self.slots
+        ]
+
+
+class SuiteScheduler:
+    """One worker per device; each worker pulls the shard it is best placed to finish next."""
+
+    def __init__(self, devices: list, run_shard: ShardRunner = None, speeds: SpeedModel = None,
+                 max_attempts: int = None, max_device_failures: int = None):
+        self.slots = [DeviceSlot(device) for device in devices]
+        self.run_shard = run_shard or run_scenario_on
+        self.speeds = speeds or SpeedModel()
+        self.max_attempts = max_attempts or Config.SCHEDULER_MAX_ATTEMPTS
+        self.max_device_failures = max_device_failures or Config.SCHEDULER_MAX_DEVICE_FAILURES
+
+        self._pending: List[Shard] = []
+        self._running = 0
+        self._condition = threading.Condition()
+
+    def run(self, scenarios: List[dict], on_shard: Callable[[Shard, Any, dict], None] = None) -> ScheduleResult:
+        """Run every scenario once; on_shard(shard, device, report) is called after each attempt."""
+        shards = [Shard(scenario) for scenario in scenarios]
+        started = time.perf_counter()
+
+        with self._condition:
+            for shard in shards:
+                if self._candidates(shard):
+                    self._pending.append(shard)
+                else:
+                    shard.error = "No connected device is capable of running this scenario"
+
+        workers = [
+            threading.Thread(target=self._work, args=(slot, on_shard), name=f"shard-{slot.device.device_id}",
+                             daemon=True)
+            for slot in self.slots
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.speeds.save()
+        return ScheduleResult(shards=shards, slots=self.slots, makespan=time.perf_counter() - started)
+
+    def _live(self, slot: DeviceSlot) -> bool:
+        # Every device of a worker that disconnected leaves the pool, not just the one that was running
+        if not slot.quarantined and not device_alive(slot.device):
+            slot.quarantined = True
+            print(f"Taking {slot.device.device_id} out of the pool: its worker is gone")
+
+        return not slot.quarantined
+
+    def _candidates(self, shard: Shard) -> List[DeviceSlot]:
+        """Live devices that can run the shard and have not tried it yet."""
+        return [
+            slot for slot in self.slots
+            if self._live(slot) and slot.device.device_id not in shard.attempts
+            and device_capable(slot.device, shard.scenario)
+        ]
+
+    def _pick(self, slot: DeviceSlot) -> Optional[Shard]:
+        now = time.perf_counter()
+        device_id = slot.device.device_id
+        mine = sorted((shard for shard in self._pending if slot in self._candidates(shard)), key=lambda s: -s.steps)
+        if not mine:
+            return None
+
+        # When the pool is expected to have drained its pending and running work, in steps over the summed throughput
+        live = [other for other in self.slots if self._live(other)]
+        rates = {other.device.device_id: 1.0 / self.speeds.estimate(other.device.device_id, 1) for other in live}
+        backlog = sum(shard.steps for shard in self._pending) + sum(
+            max(0.0, other.busy_until - now) * rates[other.device.device_id] for other in live)
+        drain = now + backlog / sum(rates.values())
+
+        # Longest first, as long as this device finishes it before the pool would drain anyway
+        for shard in mine:
+            if now + self.speeds.estimate(device_id, shard.steps) <= drain:
+                return shard
+
+        # At the tail a slow device only takes the smallest shard if nobody else would finish it sooner
+        shard = mine[-1]
+        finish = now + self.speeds.estimate(device_id, shard.steps)
+        sooner = any(
+            max(now, other.busy_until) + self.speeds.estimate(other.device.device_id, shard.steps) < finish
+            for other in self._candidates(shard) if other is not slot
+        )
+        return None if sooner else shard
+
+    def _next(self, slot: DeviceSlot) -> Optional[Shard]:
+        with self._condition:
+            while True:
+                if not self._live(slot) or (not self._pending and not self._running):
+                    return None
+
+                shard = self._pick(slot)
+                if shard is not None:
+                    self._pending.remove(shard)
+                    self._running += 1
+                    slot.busy_until = time.perf_counter() + self.speeds.estimate(slot.device.device_id, shard.steps)
+                    return shard
+
+                # Woken when a shard finishes or is requeued; the timeout covers estimates that were too low
+                self._condition.wait(timeout=1.0)
+
+    def _work(self, slot: DeviceSlot, on_shard) -> None:
+        device = slot.device
+        while True:
+            shard = self._next(slot)
+            if shard is None:
+                return
+
+            started = time.perf_counter()
+            try:
+                report = self.run_shard(device, shard.scenario)
+            except Exception as e:
+                report = {"passed": False, "error": str(e)}
+            elapsed = time.perf_counter() - started
+
+            self.speeds.observe(device.device_id, shard.steps, elapsed)
+            if on_shard:
+                on_shard(shard, device, report)
+
+            with self._condition:
+                self._running -= 1
+                shard.attempts.append(device.device_id)
+                shard.reports.append(report)
+                slot.busy += elapsed
+                slot.shards += 1
+                slot.busy_until = time.perf_counter()
+
+                if report.get("passed"):
+                    slot.failures = 0
+                else:
+                    if not device_alive(device):
+                        self._drop_unschedulable()
+
+                    slot.failures += 1
+                    if slot.failures >= self.max_device_failures:
+                        slot.quarantined = True
+                        print(f"Taking {device.device_id} out of the pool after {slot.failures} failures in a row")
+                        self._drop_unschedulable()
+
+                    if len(shard.attempts) < self.max_attempts and self._candidates(shard):
+                        self._pending.append(shard)
+
+                self._condition.notify_all()
+
+    def _drop_unschedulable(self) -> None:
+        for shard in list(self._pending):
+            if not self._candidates(shard):
+                self._pending.remove(shard)
+                shard.error = "No capable device left to run this scenario"
+
+
+def run_scenario_on(device, scenario: dict) -> dict:
+    """Run one scenario on one device through the regular executor."""
+    from runner.executor import MultiDeviceExecutor
+
+    result = MultiDeviceExecutor(max_workers=1).run([device], scenario["app"], scenario["instructions"])
+    return {
+        "passed": result.passed and all(step.status == "passed" for d in result.devices for step in d.steps),
+        "summary": result.summary(),
+        "result": result,
+    }
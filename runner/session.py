@@ -0,0 +1,156 @@
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
+from device_manager.installed_apps import find_app_by_name, resolve_launcher_activity
+from llm.function_calling import action_handlers
+from llm.planner import PlannedStep
+from utils.appium_manager import AppiumAppManager
+from utils.tracing import span, trace_context
+from utils.waits import LatencyBudget
+
+# report(level, message, progress) where level is one of info, warning, error, success
+Reporter = Callable[[str, str, Optional[float]], None]
+
+
+@dataclass
+class StepResult:
+    instruction: str
+    action: Optional[str] = None
+    resolved_by: Optional[str] = None
+    status: str = "pending"
+    error: Optional[str] = None
+    duration: float = 0.0
+    locators: Dict[str, str] = field(default_factory=dict)
+    # seconds per span category (driver, wait, parse, adb, llm, other), filled in from the run's trace
+    breakdown: Dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class DeviceRunResult:
+    device_id: str
+    device_name: str
+    status: str = "pending"
+    error: Optional[str] = None
+    duration: float = 0.0
+    steps: List[StepResult] = field(default_factory=list)
+
+    @property
+    def passed(self) -> bool:
+        return self.status == "passed"
+
+
+def _noop_reporter(level: str, message: str, progress: Optional[float] = None) -> None:
+    pass
+
+
+def run_device_session(device, app_name: str, plan: Sequence[PlannedStep], report: Reporter = None) -> DeviceRunResult:
+    """Run the whole debug session (setup, planned action loop, teardown) for one device.
+
+    `plan` is a list of steps or a PlanStream still resolving them; steps always run in order.
+    """
+    with trace_context(device_id=device.device_id):
+        return _run_device_session(device, app_name, plan, report)
+
+
+def _run_device_session(device, app_name: str, plan: Sequence[PlannedStep], report: Reporter = None) -> DeviceRunResult:
+    report = report or _noop_reporter
+    result = DeviceRunResult(device_id=device.device_id, device_name=device.device_name)
+    started = time.perf_counter()
+
+    report("info", f"📱 Running on device: {device.device_id}", 0.0)
+
+    with span("session.find_app", "session"):
+        package_name = find_app_by_name(app_name, device_id=device.device_id)
+
+    if not package_name:
+        result.status = "failed"
+        result.error = f"{app_name} is probably not installed on {device.device_name}"
+        result.duration = time.perf_counter() - started
+        report("error", result.error, None)
+        return result
+
+    manager = None
+    healthy = False
+    try:
+        with span("session.setup", "session"):
+            manager = AppiumAppManager(
+                app_package=package_name,
+                app_activity=resolve_launcher_activity(package_name, device.device_id),
+                device_id=device.device_id,
+                platform_version=device.platform_version
+            )
+            manager.manage_state()
+
+        for idx in range(len(plan)):
+            # With a PlanStream this blocks until the step is resolved; later steps resolve meanwhile
+            with trace_context(step=idx), span("step.resolve", "llm"):
+                planned = plan[idx]
+
+            step = StepResult(instruction=planned.instruction, resolved_by=planned.tier)
+            result.steps.append(step)
+
+            report("info", f"Executing instruction: {planned.instruction}", (idx + 1) / len(plan))
+
+            action = planned.action
+            if action:
+                action_type = action.get("name")
+                action_args = action.get("arguments")
+                step.action = action_type
+
+                handler = action_handlers.get(action_type)
+                if handler:
+                    report("info", f"Executing action type: {action_type}", None)
+                    budget = LatencyBudget.for_action(action_type)
+                    with trace_context(step=idx), span(f"step.{action_type}", "step", instruction=planned.instruction):
+                        performed = handler.function(manager, budget=budget, locators=planned.locators)
+                        outcome = performed.execute(**action_args)
+                    step.locators = performed.locators
+                    step.duration = budget.elapsed()
+
+                    if outcome is False:
+                        step.status = "failed"
+                        step.error = f"{action_type} did not complete: {planned.instruction}"
+                        report("error", step.error, None)
+                    else:
+                        step.status = "passed"
+
+                    if budget.exceeded:
+                        report("warning", f"{action_type} took {step.duration:.1f}s, over its {budget.seconds}s budget", None)
+
+                else:
+                    step.status = "skipped"
+                    step.error = f"No handler defined for action type: {action_type}"
+                    report("warning", step.error, None)
+            else:
+                step.status = "failed"
+                step.error = "Failed to interpret instruction."
+                report("error", step.error, None)
+
+        # The driver is still usable after a step that failed without raising
+        healthy = True
+        failed = [step for step in result.steps if step.status == "failed"]
+        if failed:
+            result.status = "failed"
+            result.error = f"{len(failed)} of {len(result.steps)} steps failed"
+            report("error", result.error, None)
+        else:
+            result.status = "passed"
+            report("success", "Debug process completed successfully!", 1.0)
+
+    except Exception as e:
+        if result.steps and result.steps[-1].status == "pending":
+            result.steps[-1].status = "failed"
+            result.steps[-1].error = str(e)
+
+        result.status = "failed"
+        result.error = f"Error during debug process: {str(e)}"
+        report("error", result.error, None)
+
+    finally:
+        if manager:
+            # A session that raised is recycled rather than reused by the next run
+            manager.quit(reuse=healthy)
+
+        result.duration = time.perf_counter() - started
+
+    return result
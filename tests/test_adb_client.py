@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import unittest
+from device_manager.adb_client import AdbClient, AdbError
+
+
+class FakeAdbServer:
+    """Just enough of the adb server protocol: host:devices, host:transport, shell: and exec:."""
+
+    def __init__(self, devices: dict, delay: float = 0.0):
+        # serial -> {command: output bytes}
+        self.devices = devices
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    @staticmethod
+    async def _service(reader) -> str:
+        length = int(await reader.readexactly(4), 16)
+        return (await reader.readexactly(length)).decode("utf-8")
+
+    @staticmethod
+    def _fail(writer, message: str) -> None:
+        payload = message.encode("utf-8")
+        writer.write(b"FAIL" + b"%04x" % len(payload) + payload)
+
+    async def _handle(self, reader, writer):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            service = await self._service(reader)
+            if service == "host:devices":
+                listing = "".join(f"{serial}\tdevice\n" for serial in self.devices).encode("utf-8")
+                writer.write(b"OKAY" + b"%04x" % len(listing) + listing)
+                return
+
+            serial = service.partition("host:transport:")[2]
+            if serial not in self.devices:
+                self._fail(writer, f"device '{serial}' not found")
+                return
+
+            writer.write(b"OKAY")
+            command = (await self._service(reader)).partition(":")[2]
+            await asyncio.sleep(self.delay)
+            writer.write(b"OKAY" + self.devices[serial].get(command, b""))
+
+        finally:
+            self.active -= 1
+            await writer.drain()
+            writer.close()
+
+
+class AdbClientTest(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.fake = FakeAdbServer({
+            "emulator-5554": {"getprop ro.build.version.release": b"14\n", "screencap -p": b"\x89PNG\r\n\x00"},
+            "emulator-5556": {"getprop ro.build.version.release": b"13\n"},
+        })
+        self.client = AdbClient(host="127.0.0.1", port=await self.fake.start(), max_concurrency=2, timeout=5)
+
+    async def asyncTearDown(self):
+        await self.fake.stop()
+
+    async def test_devices(self):
+        self.assertEqual(await self.client.devices(), [("emulator-5554", "device"), ("emulator-5556", "device")])
+
+    async def test_shell(self):
+        self.assertEqual(await self.client.shell("emulator-5554", "getprop ro.build.version.release"), "14\n")
+
+    async def test_unknown_serial_raises_with_server_message(self):
+        with self.assertRaisesRegex(AdbError, "device 'missing' not found"):
+            await self.client.shell("missing", "getprop ro.build.version.release")
+
+    async def test_shell_many_returns_failures_in_place(self):
+        results = await self.client.shell_many([
+            ("emulator-5554", "getprop ro.build.version.release"),
+            ("missing", "getprop ro.build.version.release"),
+            ("emulator-5556", "getprop ro.build.version.release"),
+        ])
+
+        self.assertEqual(results[0], "14\n")
+        self.assertIsInstance(results[1], AdbError)
+        self.assertEqual(results[2], "13\n")
+
+    async def test_exec_out_keeps_binary_output(self):
+        self.assertEqual(await self.client.exec_out("emulator-5554", "screencap -p"), b"\x89PNG\r\n\x00")
+
+    async def test_concurrency_is_capped(self):
+        self.fake.delay = 0.05
+        await self.client.shell_many([("emulator-5554", "getprop ro.build.version.release")] * 8)
+
+        self.assertEqual(self.fake.peak, 2)
+
+
+class AdbClientSyncTest(unittest.TestCase):
+
+    def test_run_from_a_synchronous_caller(self):
+        fake = FakeAdbServer({"emulator-5554": {}})
+        loop = asyncio.new_event_loop()
+        port = loop.run_until_complete(fake.start())
+        # The fake server needs a running loop of its own while the client uses its background loop
+        threading.Thread(target=loop.run_forever, daemon=True).start()
+        try:
+            client = AdbClient(host="127.0.0.1", port=port, timeout=5)
+            self.assertEqual(client.run(client.devices()), [("emulator-5554", "device")])
+        finally:
+            loop.call_soon_threadsafe(loop.stop)
+
+
+if __name__ == "__main__":
+    unittest.main()
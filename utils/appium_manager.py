@@ -1,5 +1,8 @@
+from device_manager.installed_apps import resolve_app_version
 from device_manager.reload_app import AppReload
+from utils.config import Config
 from utils.driver_factory import DriverFactory
+from utils.session_pool import SessionPool
 
 
 class AppiumAppManager:
@@ -16,17 +19,38 @@ class AppiumAppManager:
         self.app_activity = app_activity
         self.device_id = kwargs.get("device_id")
         self.platform_version = kwargs.get("platform_version")
+        self._app_version = None
 
-        self.driver = DriverFactory.create_driver(
-            self.device_id, app_package, app_activity, self.platform_version
-        )
+        if Config.SESSION_POOL_ENABLED:
+            self.driver = SessionPool.default().acquire(
+                self.device_id, app_package, app_activity, self.platform_version
+            )
+        else:
+            self.driver = DriverFactory.create_driver(
+                self.device_id, app_package, app_activity, self.platform_version
+            )
+
+    @property
+    def app_version(self) -> str | None:
+        """Installed version of the app under test, read from the device once per manager."""
+        if self._app_version is None and self.device_id:
+            self._app_version = resolve_app_version(self.app_package, self.device_id) or ""
+
+        return self._app_version or None
 
     def manage_state(self):
         app_state_manager = AppReload(driver=self.driver, app_package=self.app_package)
         if app_state_manager.is_app_running():
             app_state_manager.kill_app()
 
-    def quit(self):
-        """Quit the Appium driver"""
-        if self.driver:
+    def quit(self, reuse: bool = True):
+        """Quit the Appium driver, or hand it back to the session pool when `reuse` is allowed"""
+        if not self.driver:
+            return
+
+        if Config.SESSION_POOL_ENABLED:
+            SessionPool.default().release(self.driver, healthy=reuse)
+        else:
             self.driver.quit()
+
+        self.driver = None
@@ -1,7 +1,139 @@
+import os
 
 
 class Config:
 
     DRIVER_URL = "http://127.0.0.1:4723"
+    # Per-device Appium servers, "serial=url,serial=url"; devices without an entry use DRIVER_URL
+    DRIVER_URLS = dict(
+        item.strip().split("=", 1) for item in os.environ.get("DRIVER_URLS", "").split(",") if "=" in item
+    )
     TIMEOUT = 10
     ADB_PATH = "adb"
+
+    # Number of device sessions allowed to run at the same time
+    MAX_PARALLEL_DEVICES = 4
+
+    # Number of instructions sent to the LLM at the same time while planning a run
+    MAX_PARALLEL_LLM_CALLS = 8
+
+    # Pipelined runs resolve instructions while devices execute earlier ones, at most PIPELINE_LOOKAHEAD
+    # steps ahead of the furthest device so a failing run does not resolve instructions it never reaches
+    PIPELINE_ENABLED = True
+    PIPELINE_LOOKAHEAD = 2
+
+    # Persistent instruction -> action cache used by the LLM parser
+    LLM_CACHE_ENABLED = True
+    LLM_CACHE_PATH = os.path.join(os.getcwd(), ".cache", "llm_actions.sqlite")
+    LLM_CACHE_MAX_ENTRIES = 5000
+    LLM_CACHE_TTL = 7 * 24 * 60 * 60  # seconds, 0 disables expiry
+
+    # Shared OpenAI client: timeouts in seconds, retries cover 429 and 5xx responses
+    LLM_TIMEOUT = 30.0
+    LLM_CONNECT_TIMEOUT = 5.0
+    LLM_MAX_RETRIES = 3
+    LLM_MAX_CONNECTIONS = 16
+    LLM_KEEPALIVE_EXPIRY = 60.0
+
+    # Instruction parser backend, tried after the rule tier: "openai" (cache, then remote LLM),
+    # "local" (offline dataset classifier) or "auto" (cache, local classifier, then remote LLM)
+    PARSER_BACKEND = os.environ.get("PARSER_BACKEND", "openai")
+    LOCAL_PARSER_DATASET = os.environ.get("LOCAL_PARSER_DATASET")
+    LOCAL_PARSER_MIN_SCORE = 0.3
+    # In "auto" the local classifier must be this sure before the remote LLM is skipped
+    LOCAL_PARSER_AUTO_MIN_SCORE = 0.6
+
+    # "tools" sends the action catalogue as function-calling schemas and reads back structured
+    # arguments, "completion" keeps the legacy free-text "Action:/Parameters:" prompt
+    LLM_MODE = os.environ.get("LLM_MODE", "completion")
+
+    # A cached UI snapshot is re-read after this many seconds even if no action touched the screen
+    UI_SNAPSHOT_MAX_AGE = 2.0
+    UI_PARSE_CHUNK_SIZE = 64 * 1024
+
+    # Adaptive polling: start at WAIT_MIN_INTERVAL seconds and back off by WAIT_BACKOFF up to WAIT_MAX_INTERVAL
+    WAIT_MIN_INTERVAL = 0.05
+    WAIT_MAX_INTERVAL = 0.5
+    WAIT_BACKOFF = 1.5
+    # Longest wait for the screen to stop changing before a step that needs it settled (a screenshot)
+    WAIT_SETTLE_TIMEOUT = 3.0
+
+    # Per-action latency budgets in seconds; waits inside an action never run past its budget
+    ACTION_BUDGETS = {
+        "open_app": 20,
+        "wait_for_screen": 10,
+        "take_screenshot": 10,
+        "search": 25,
+    }
+
+    # Appium sessions kept warm between runs, keyed by (device, package)
+    SESSION_POOL_ENABLED = True
+    SESSION_POOL_PREWARM = True
+    SESSION_POOL_MAX_USES = 20
+    SESSION_POOL_IDLE_TIMEOUT = 30 * 60  # seconds, must stay below the driver's new_command_timeout
+
+    # Connected device registry: the device list is re-read after DEVICE_LIST_TTL seconds (and every
+    # DEVICE_REFRESH_INTERVAL seconds in the background); device properties after DEVICE_INFO_TTL
+    DEVICE_LIST_TTL = 5.0
+    DEVICE_INFO_TTL = 300.0
+    DEVICE_REFRESH_INTERVAL = 3.0
+    MAX_PARALLEL_ADB_CALLS = 8
+
+    # Installed package index: the on-device package list checksum is re-checked at most every PACKAGE_INDEX_TTL seconds
+    PACKAGE_INDEX_TTL = 30.0
+
+    # adb server socket used by the async ADB client (same port variable the adb binary honours)
+    ADB_SERVER_HOST = "127.0.0.1"
+    ADB_SERVER_PORT = int(os.environ.get("ANDROID_ADB_SERVER_PORT", "5037"))
+    ADB_COMMAND_TIMEOUT = 30.0
+
+    # Screenshot pipeline: frames are encoded and written by SCREENSHOT_WORKERS background threads, with at most
+    # SCREENSHOT_QUEUE_SIZE frames waiting. Format png|jpeg|webp; MAX_WIDTH 0 keeps full resolution
+    SCREENSHOT_WORKERS = 2
+    SCREENSHOT_QUEUE_SIZE = 16
+    SCREENSHOT_FORMAT = os.environ.get("SCREENSHOT_FORMAT", "png")
+    SCREENSHOT_QUALITY = 85
+    SCREENSHOT_MAX_WIDTH = 0
+    # Reuse the file of an identical earlier frame from the same device instead of writing it again; the
+    # newest SCREENSHOT_DEDUPE_MAX_FRAMES digests are remembered per device and directory
+    SCREENSHOT_DEDUPE = os.environ.get("SCREENSHOT_DEDUPE", "0") == "1"
+    SCREENSHOT_DEDUPE_MAX_FRAMES = 64
+
+    # Screenshot capture backend: webdriver (Appium), screencap (adb exec-out PNG) or screencap-raw (unencoded
+    # pixels, encoded by the pipeline). SCREENSHOT_BACKENDS overrides it per device: "serial=backend,serial=backend"
+    SCREENSHOT_BACKEND = os.environ.get("SCREENSHOT_BACKEND", "webdriver")
+    SCREENSHOT_BACKENDS = dict(
+        item.strip().split("=", 1) for item in os.environ.get("SCREENSHOT_BACKENDS", "").split(",") if "=" in item
+    )
+
+    # Tracing: spans around LLM calls, actions, driver commands, ADB calls, waits and UI parsing are
+    # recorded during each run and, unless TRACE_EXPORT=0, written to TRACE_DIR as Chrome trace JSON
+    # (only the newest TRACE_KEEP files are kept)
+    TRACE_ENABLED = os.environ.get("TRACE_ENABLED", "1") != "0"
+    TRACE_EXPORT = os.environ.get("TRACE_EXPORT", "1") != "0"
+    TRACE_DIR = os.path.join(os.getcwd(), ".cache", "traces")
+    TRACE_KEEP = int(os.environ.get("TRACE_KEEP", "20"))
+    TRACE_MAX_SPANS = 200_000
+
+    # Element locators remembered from earlier runs get this long before falling back to discovery
+    CACHED_LOCATOR_TIMEOUT = 2.0
+
+    # Discovered locators (e.g. the search box resource-id) stored per app package and version
+    LOCATOR_STORE_ENABLED = True
+    LOCATOR_STORE_PATH = os.path.join(os.getcwd(), ".cache", "locators.sqlite")
+
+    # Sharded suites (`runner.cli --shard`): a failed scenario is retried on another device up to SCHEDULER_MAX_ATTEMPTS
+    # runs in total, and a device failing SCHEDULER_MAX_DEVICE_FAILURES scenarios in a row leaves the pool. Measured
+    # seconds per step are kept per device in DEVICE_SPEEDS_PATH; unmeasured devices start at the average
+    SCHEDULER_MAX_ATTEMPTS = 2
+    SCHEDULER_MAX_DEVICE_FAILURES = 3
+    SCHEDULER_DEFAULT_STEP_SECONDS = 5.0
+    DEVICE_SPEEDS_PATH = os.path.join(os.getcwd(), ".cache", "device_speeds.json")
+
+    # Multi-node runs (`runner.cluster`): the coordinator listens here and workers dial in
+    CLUSTER_HOST = os.environ.get("CLUSTER_HOST", "127.0.0.1")
+    CLUSTER_PORT = int(os.environ.get("CLUSTER_PORT", "7700"))
+    CLUSTER_CONNECT_TIMEOUT = 30.0
+
+    # Replay scripts written by `runner.cli --record` and used by `--replay`
+    REPLAY_DIR = os.path.join(os.getcwd(), ".cache", "replays")
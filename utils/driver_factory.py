@@ -1,12 +1,18 @@
 from appium.webdriver import Remote
 from appium.options.android import UiAutomator2Options
 from utils.config import Config
+from utils.tracing import instrument_driver, span
+
+
+def driver_url_for(device_id: str) -> str:
+    """The Appium server for a device: its DRIVER_URLS entry, otherwise the shared DRIVER_URL."""
+    return Config.DRIVER_URLS.get(device_id, Config.DRIVER_URL)
 
 
 class DriverFactory:
 
     @staticmethod
-    def create_driver(device_id, app_package, app_activity, platform_version):
+    def create_driver(device_id, app_package, app_activity, platform_version, driver_url: str = None):
         options = UiAutomator2Options()
         options.device_name = device_id
         options.app_package = app_package
@@ -16,4 +22,7 @@ class DriverFactory:
         options.platform_version = platform_version
         options.new_command_timeout = 6000
 
-        return Remote(Config.DRIVER_URL, options=options)
\ No newline at end of file
+        with span("driver.new_session", "driver", device_id=device_id, app_package=app_package):
+            driver = Remote(driver_url or driver_url_for(device_id), options=options)
+
+        return instrument_driver(driver)
\ No newline at end of file
@@ -0,0 +1,101 @@
+import functools
+import importlib.util
+import struct
+from typing import Callable, Dict, NamedTuple, Optional
+from device_manager.adb_client import AdbClient
+from utils.config import Config
+
+# screencap pixel formats with 4 bytes per pixel (android.graphics.PixelFormat) -> Pillow (mode, raw mode)
+RAW_MODES = {1: ("RGBA", "RGBA"), 2: ("RGB", "RGBX")}
+
+
+class Frame(NamedTuple):
+    data: bytes
+    # True for `screencap` raw pixels (header + RGBA), False for an encoded PNG
+    raw: bool = False
+
+
+def capture_webdriver(driver, device_id: str) -> Frame:
+    """PNG through Appium: the device encodes it, then it travels as base64 inside a JSON response."""
+    return Frame(driver.get_screenshot_as_png())
+
+
+def capture_screencap(driver, device_id: str) -> Frame:
+    """PNG straight from `adb exec-out screencap -p`, skipping the WebDriver round-trip and base64."""
+    client = AdbClient.default()
+    return Frame(client.run(client.exec_out(device_id, "screencap -p")))
+
+
+def capture_screencap_raw(driver, device_id: str) -> Frame:
+    """Unencoded pixels from `screencap`; the device does no PNG work and the pipeline encodes off-thread."""
+    client = AdbClient.default()
+    return Frame(client.run(client.exec_out(device_id, "screencap")), raw=True)
+
+
+BACKENDS: Dict[str, Callable[[object, str], Frame]] = {
+    "webdriver": capture_webdriver,
+    "screencap": capture_screencap,
+    "screencap-raw": capture_screencap_raw,
+}
+
+
+def backend_for(device_id: str) -> str:
+    return Config.SCREENSHOT_BACKENDS.get(device_id, Config.SCREENSHOT_BACKEND)
+
+
+def capture(driver, device_id: str, backend: Optional[str] = None) -> Frame:
+    """Grab one frame with the device's configured backend, falling back to WebDriver if adb fails."""
+    backend = backend or backend_for(device_id)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown capture backend '{backend}', expected one of {sorted(BACKENDS)}")
+
+    if backend == "webdriver":
+        return capture_webdriver(driver, device_id)
+
+    if backend == "screencap-raw" and not has_pillow():
+        # Raw frames are decoded in the background; without Pillow they would be lost after capture "succeeded"
+        _warn_once("Pillow is not installed, using screencap -p instead of screencap-raw")
+        backend = "screencap"
+
+    try:
+        frame = BACKENDS[backend](driver, device_id)
+        if frame.data:
+            return frame
+
+        print(f"{backend} returned an empty frame for {device_id}, using webdriver")
+
+    except Exception as e:
+        print(f"{backend} capture failed for {device_id}, using webdriver: {e}")
+
+    return capture_webdriver(driver, device_id)
+
+
+@functools.lru_cache(maxsize=None)
+def has_pillow() -> bool:
+    """Pillow is optional; without it frames can only be kept as the PNG the device produced."""
+    return importlib.util.find_spec("PIL") is not None
+
+
+@functools.lru_cache(maxsize=None)
+def _warn_once(message: str) -> None:
+    print(message)
+
+
+def decode_raw(data: bytes):
+    """Turn `screencap` raw output into a Pillow image.
+
+    The header is width, height and pixel format as little-endian uint32, plus a colour space field
+    since Android 9, so its size is whatever remains after the pixels.
+    """
+    from PIL import Image
+
+    width, height, pixel_format = struct.unpack_from("<III", data)
+    if pixel_format not in RAW_MODES:
+        raise ValueError(f"Unsupported screencap pixel format {pixel_format}")
+
+    header = len(data) - width * height * 4
+    if header not in (12, 16):
+        raise ValueError(f"Unexpected screencap size {len(data)} for {width}x{height}")
+
+    mode, raw_mode = RAW_MODES[pixel_format]
+    return Image.frombytes(mode, (width, height), memoryview(data)[header:], "raw", raw_mode)
@@ -0,0 +1,157 @@
+import atexit
+import datetime
+import hashlib
+import io
+import os
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Dict, Optional, Set, Tuple
+from utils.config import Config
+from utils.screen_capture import decode_raw, has_pillow
+
+FORMATS = {"png": ("PNG", ".png"), "jpeg": ("JPEG", ".jpg"), "jpg": ("JPEG", ".jpg"), "webp": ("WEBP", ".webp")}
+
+
+def safe_filename(prefix: str = "", extension: str = ".png") -> str:
+    """Sortable timestamp name without spaces or colons, e.g. `home-20250101-101502-123456.png`."""
+    stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    prefix = re.sub(r"[^A-Za-z0-9._-]+", "_", prefix).strip("_")
+    return f"{prefix}-{stamp}{extension}" if prefix else f"{stamp}{extension}"
+
+
+class ScreenshotPipeline:
+    """Encodes and writes captured screenshots on worker threads so capturing costs only the transfer.
+
+    At most `queue_size` frames wait in memory; submit() blocks once that many are pending, which
+    slows the caller down instead of letting a burst of captures grow without bound.
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, workers: int = None, queue_size: int = None, image_format: str = None,
+                 quality: int = None, max_width: int = None, dedupe: bool = None):
+        self.image_format = (image_format or Config.SCREENSHOT_FORMAT).lower()
+        if self.image_format not in FORMATS:
+            raise ValueError(f"Unsupported screenshot format '{self.image_format}', expected one of {sorted(FORMATS)}")
+
+        self.quality = quality or Config.SCREENSHOT_QUALITY
+        self.max_width = Config.SCREENSHOT_MAX_WIDTH if max_width is None else max_width
+
+        # Decided once up front so files are never written as PNG bytes behind a .jpg or .webp name
+        self.can_encode = has_pillow()
+        if not self.can_encode and (self.image_format != "png" or self.max_width):
+            print(f"Pillow is not installed, saving screenshots as full-size PNG instead of {self.image_format}")
+            self.image_format, self.max_width = "png", 0
+        self.dedupe = Config.SCREENSHOT_DEDUPE if dedupe is None else dedupe
+
+        self._pool = ThreadPoolExecutor(max_workers=workers or Config.SCREENSHOT_WORKERS,
+                                        thread_name_prefix="screenshot-writer")
+        self._slots = threading.BoundedSemaphore(queue_size or Config.SCREENSHOT_QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._pending: Set[Future] = set()
+        # (directory, device) -> frame digest -> file written for it, least recently used first
+        self._written: Dict[Tuple[str, str], "OrderedDict[str, str]"] = {}
+
+    @classmethod
+    def default(cls) -> "ScreenshotPipeline":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+                atexit.register(cls._default.close)
+
+        return cls._default
+
+    @property
+    def extension(self) -> str:
+        return FORMATS[self.image_format][1]
+
+    def submit(self, image: bytes, directory: str, prefix: str = "", raw: bool = False, device_id: str = "") -> Future:
+        """Queue a PNG (or raw `screencap`) frame for writing; the future resolves to the saved path."""
+        self._slots.acquire()
+        try:
+            future = self._pool.submit(self._process, image, directory, safe_filename(prefix, self.extension), raw,
+                                       device_id)
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            self._pending.add(future)
+
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+        self._slots.release()
+        if future.exception() is not None:
+            print(f"Failed to write screenshot: {future.exception()}")
+
+    def _process(self, image: bytes, directory: str, filename: str, raw: bool = False, device_id: str = "") -> str:
+        # Frames are only matched against the same device, so one device never reuses another device's file
+        key = (directory, device_id)
+        if self.dedupe:
+            digest = hashlib.blake2b(image, digest_size=16).hexdigest()
+            with self._lock:
+                existing = self._written.get(key, {}).get(digest)
+                if existing:
+                    self._written[key].move_to_end(digest)
+
+            # Identical frame already on disk, e.g. a screenshot of a screen that has not changed
+            if existing and os.path.exists(existing):
+                return existing
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, filename)
+        data = self._encode(image, raw)
+
+        # Write under a temporary name so readers never see a half-written file
+        with open(path + ".part", "wb") as file:
+            file.write(data)
+        os.replace(path + ".part", path)
+
+        if self.dedupe:
+            with self._lock:
+                written = self._written.setdefault(key, OrderedDict())
+                written[digest] = path
+                while len(written) > Config.SCREENSHOT_DEDUPE_MAX_FRAMES:
+                    written.popitem(last=False)
+
+        return path
+
+    def _encode(self, image: bytes, raw: bool = False) -> bytes:
+        if not raw and self.image_format == "png" and not self.max_width:
+            return image
+
+        if not self.can_encode:
+            raise RuntimeError("Pillow is required to save raw screencap frames")
+
+        from PIL import Image
+
+        with (decode_raw(image) if raw else Image.open(io.BytesIO(image))) as picture:
+            if self.max_width and picture.width > self.max_width:
+                height = round(picture.height * self.max_width / picture.width)
+                picture = picture.resize((self.max_width, height), Image.Resampling.BILINEAR)
+
+            pil_format = FORMATS[self.image_format][0]
+            if pil_format == "JPEG" and picture.mode != "RGB":
+                picture = picture.convert("RGB")
+
+            buffer = io.BytesIO()
+            picture.save(buffer, format=pil_format, quality=self.quality)
+            return buffer.getvalue()
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Wait until every queued screenshot has been written."""
+        with self._lock:
+            pending = list(self._pending)
+
+        wait(pending, timeout=timeout)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=True)
@@ -0,0 +1,185 @@
+import atexit
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple
+from components.ui_index import UISnapshotCache
+from utils.config import Config
+from utils.driver_factory import DriverFactory
+
+SessionKey = Tuple[str, str]
+
+
+@dataclass
+class PooledSession:
+    key: SessionKey
+    driver: object
+    uses: int = 0
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+
+
+class SessionPool:
+    """Warm Appium sessions keyed by (device, package), reused between runs instead of recreated."""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_uses: int = None, idle_timeout: float = None):
+        self.max_uses = max_uses or Config.SESSION_POOL_MAX_USES
+        self.idle_timeout = idle_timeout or Config.SESSION_POOL_IDLE_TIMEOUT
+
+        self._lock = threading.Lock()
+        self._idle: Dict[SessionKey, List[PooledSession]] = {}
+        self._leased: Dict[int, PooledSession] = {}
+        self._warming: Dict[SessionKey, Future] = {}
+        # Warm-ups already asked for, by (device, package) and by (device, app name)
+        self._prewarmed: Set[SessionKey] = set()
+        self._prewarmed_apps: Set[Tuple[str, str]] = set()
+        self._warmer = ThreadPoolExecutor(max_workers=Config.MAX_PARALLEL_DEVICES, thread_name_prefix="session-warmer")
+
+    @classmethod
+    def default(cls) -> "SessionPool":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+                atexit.register(cls._default.close)
+
+        return cls._default
+
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        """Cheap liveness probe: one small request that fails fast if the session is gone."""
+        try:
+            return bool(driver.session_id) and driver.current_package is not None
+        except Exception:
+            return False
+
+    def acquire(self, device_id: str, app_package: str, app_activity: str, platform_version: str):
+        key = (device_id, app_package)
+
+        with self._lock:
+            warming = self._warming.get(key)
+
+        # A background warm-up for the same session is cheaper to wait for than a second session
+        if warming is not None:
+            try:
+                warming.result()
+            except Exception as e:
+                print(f"Session warm-up for {device_id} failed: {e}")
+
+        while True:
+            with self._lock:
+                session = self._idle.get(key, []).pop() if self._idle.get(key) else None
+
+            if session is None:
+                break
+
+            if time.monotonic() - session.last_used <= self.idle_timeout and self.is_healthy(session.driver):
+                return self._lease(session)
+
+            self._quit(session)
+
+        driver = DriverFactory.create_driver(device_id, app_package, app_activity, platform_version)
+        return self._lease(PooledSession(key=key, driver=driver))
+
+    def _lease(self, session: PooledSession):
+        session.uses += 1
+        session.last_used = time.monotonic()
+
+        with self._lock:
+            self._leased[id(session.driver)] = session
+
+        # The screen may have changed since this driver last looked at it
+        UISnapshotCache.invalidate(session.driver)
+        return session.driver
+
+    def release(self, driver, healthy: bool = True) -> None:
+        """Return a driver to the pool; sessions that errored or reached max_uses are closed instead."""
+        with self._lock:
+            session = self._leased.pop(id(driver), None)
+
+        if session is None:
+            driver.quit()
+            return
+
+        if not healthy or session.uses >= self.max_uses:
+            self._quit(session)
+            return
+
+        session.last_used = time.monotonic()
+        with self._lock:
+            self._idle.setdefault(session.key, []).append(session)
+
+    def _holds_session(self, device_id: str) -> bool:
+        """Any pooled session on the device, for any package; UiAutomator2 serves one session per device."""
+        return (any(session.key[0] == device_id for session in self._leased.values())
+                or any(key[0] == device_id and sessions for key, sessions in self._idle.items())
+                or any(key[0] == device_id for key in self._warming))
+
+    def prewarm(self, device_id: str, app_package: str, app_activity: str, platform_version: str) -> None:
+        """Open a session in the background so the next run on this device starts instantly.
+
+        Only once per (device, package), and never on a device that already holds a session: a second
+        one would end the session a run is using or the one kept warm for another app.
+        """
+        key = (device_id, app_package)
+
+        with self._lock:
+            if key in self._prewarmed or self._holds_session(device_id):
+                return
+
+            self._prewarmed.add(key)
+            self._warming[key] = self._warmer.submit(
+                self._warm, key, device_id, app_package, app_activity, platform_version
+            )
+
+    def prewarm_app(self, device_id: str, app_name: str, platform_version: str) -> None:
+        """prewarm() by app name; the package and launcher lookups run on the warmer thread as well."""
+        with self._lock:
+            if (device_id, app_name) in self._prewarmed_apps or self._holds_session(device_id):
+                return
+
+            self._prewarmed_apps.add((device_id, app_name))
+
+        self._warmer.submit(self._prewarm_app, device_id, app_name, platform_version)
+
+    def _prewarm_app(self, device_id: str, app_name: str, platform_version: str) -> None:
+        from device_manager.installed_apps import find_app_by_name, resolve_launcher_activity
+
+        try:
+            package_name = find_app_by_name(app_name, device_id=device_id)
+            if package_name:
+                self.prewarm(device_id, package_name, resolve_launcher_activity(package_name, device_id),
+                             platform_version)
+        except Exception as e:
+            print(f"Could not prewarm {app_name} on {device_id}: {e}")
+
+    def _warm(self, key: SessionKey, device_id: str, app_package: str, app_activity: str, platform_version: str):
+        try:
+            driver = DriverFactory.create_driver(device_id, app_package, app_activity, platform_version)
+            with self._lock:
+                self._idle.setdefault(key, []).append(PooledSession(key=key, driver=driver))
+
+        finally:
+            with self._lock:
+                self._warming.pop(key, None)
+
+    @staticmethod
+    def _quit(session: PooledSession) -> None:
+        try:
+            session.driver.quit()
+        except Exception as e:
+            print(f"Error closing session for {session.key[0]}: {e}")
+
+    def close(self) -> None:
+        """Quit every idle session; leased ones are closed when released."""
+        self._warmer.shutdown(wait=True, cancel_futures=True)
+
+        with self._lock:
+            idle = [session for sessions in self._idle.values() for session in sessions]
+            self._idle.clear()
+
+        for session in idle:
+            self._quit(session)
@@ -0,0 +1,253 @@
+import contextvars
+import datetime
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from utils.config import Config
+
+# Attributes (device_id, step, ...) inherited by every span opened in the current thread or task
+_attributes: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar("trace_attributes", default={})
+
+# Token of the recording that spans finished in this context belong to
+_recording: contextvars.ContextVar[Optional[object]] = contextvars.ContextVar("trace_recording", default=None)
+
+# Categories shown in the per-step breakdown; everything else counts as "other"
+BREAKDOWN_CATEGORIES = ("driver", "wait", "parse", "adb", "llm")
+
+
+@dataclass
+class Span:
+    name: str
+    category: str
+    start: float
+    duration: float
+    thread_id: int
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def end(self) -> float:
+        return self.start + self.duration
+
+
+class Tracer:
+    """Collects timed spans while at least one recording is active; otherwise span() costs one check."""
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, enabled: bool = None, max_spans: int = None):
+        self.enabled = Config.TRACE_ENABLED if enabled is None else enabled
+        self.max_spans = max_spans or Config.TRACE_MAX_SPANS
+
+        self._lock = threading.Lock()
+        # Keyed by a token per recording: concurrent recordings often hold equal (empty) lists
+        self._recordings: Dict[object, List[Span]] = {}
+
+    @classmethod
+    def default(cls) -> "Tracer":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+
+        return cls._default
+
+    @contextmanager
+    def recording(self) -> Iterator[List[Span]]:
+        """Collect the spans finished inside the block, and on threads started with submit_in_context() from it.
+
+        Spans from threads that carry no recording (background refreshers, ...) are kept only while a
+        single recording is active, so concurrent runs never see each other's spans.
+        """
+        spans: List[Span] = []
+        token = object()
+        with self._lock:
+            self._recordings[token] = spans
+        context_token = _recording.set(token)
+
+        try:
+            yield spans
+        finally:
+            _recording.reset(context_token)
+            with self._lock:
+                del self._recordings[token]
+
+    @contextmanager
+    def span(self, name: str, category: str = "app", **attributes) -> Iterator[Dict[str, Any]]:
+        """Time the block; the yielded dict can be extended with attributes known only inside it."""
+        if not self.enabled or not self._recordings:
+            yield {}
+            return
+
+        attributes = {**_attributes.get(), **attributes}
+        started = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException as e:
+            attributes["error"] = repr(e)
+            raise
+        finally:
+            self._record(Span(name, category, started, time.perf_counter() - started, threading.get_ident(), attributes))
+
+    def _record(self, span: Span) -> None:
+        owner = _recording.get()
+        with self._lock:
+            if owner in self._recordings:
+                targets = [self._recordings[owner]]
+            elif owner is None and len(self._recordings) == 1:
+                targets = list(self._recordings.values())
+            else:
+                targets = []
+
+            for spans in targets:
+                if len(spans) < self.max_spans:
+                    spans.append(span)
+
+
+@contextmanager
+def trace_context(**attributes) -> Iterator[None]:
+    """Attach attributes to every span opened inside the block (in this thread or task)."""
+    token = _attributes.set({**_attributes.get(), **attributes})
+    try:
+        yield
+    finally:
+        _attributes.reset(token)
+
+
+def submit_in_context(pool, function: Callable, *args, **kwargs):
+    """pool.submit() that runs the task in a copy of the caller's context: its recording and trace attributes."""
+    return pool.submit(contextvars.copy_context().run, function, *args, **kwargs)
+
+
+def span(name: str, category: str = "app", **attributes):
+    return Tracer.default().span(name, category, **attributes)
+
+
+def traced(name: str = None, category: str = "app") -> Callable:
+    """Decorator form of span(), named after the function unless `name` is given."""
+    def decorator(function):
+        span_name = name or function.__qualname__
+
+        if inspect.iscoroutinefunction(function):
+            @functools.wraps(function)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, category):
+                    return await function(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with span(span_name, category):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_driver(driver):
+    """Trace every WebDriver command; find_element, page_source, clicks etc. all go through execute()."""
+    execute = driver.execute
+
+    @functools.wraps(execute)
+    def traced_execute(driver_command, params=None):
+        with span(f"driver.{driver_command}", "driver"):
+            return execute(driver_command, params)
+
+    driver.execute = traced_execute
+    return driver
+
+
+def exclusive_times(spans: List[Span]) -> Dict[int, float]:
+    """Self time of each span (by index): its duration minus that of spans nested directly inside it."""
+    self_times = {index: span.duration for index, span in enumerate(spans)}
+    by_thread: Dict[int, List[int]] = {}
+    for index, span in enumerate(spans):
+        by_thread.setdefault(span.thread_id, []).append(index)
+
+    for indexes in by_thread.values():
+        indexes.sort(key=lambda i: (spans[i].start, -spans[i].duration))
+        stack: List[int] = []
+        for index in indexes:
+            while stack and spans[stack[-1]].end <= spans[index].start:
+                stack.pop()
+
+            if stack:
+                self_times[stack[-1]] -= spans[index].duration
+
+            stack.append(index)
+
+    return self_times
+
+
+def breakdown(spans: List[Span], **match) -> Dict[str, float]:
+    """Seconds spent per category by the spans whose attributes match, without double counting nesting."""
+    selected = [span for span in spans if all(span.attributes.get(key) == value for key, value in match.items())]
+    totals = dict.fromkeys(BREAKDOWN_CATEGORIES + ("other",), 0.0)
+
+    for index, seconds in exclusive_times(selected).items():
+        category = selected[index].category
+        totals[category if category in totals else "other"] += max(seconds, 0.0)
+
+    return totals
+
+
+def to_chrome_trace(spans: List[Span]) -> Dict[str, Any]:
+    """Chrome trace event format (chrome://tracing, Perfetto): one process per device, one track per thread."""
+    origin = min((span.start for span in spans), default=0.0)
+    processes: Dict[str, int] = {}
+    events = []
+
+    for span in spans:
+        process = str(span.attributes.get("device_id", "control"))
+        pid = processes.setdefault(process, len(processes) + 1)
+        events.append({
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": round((span.start - origin) * 1e6, 3),
+            "dur": round(span.duration * 1e6, 3),
+            "pid": pid,
+            "tid": span.thread_id,
+            "args": {key: value if isinstance(value, (int, float, bool)) else str(value)
+                     for key, value in span.attributes.items()},
+        })
+
+    for process, pid in processes.items():
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": process}})
+
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(spans: List[Span], path: Optional[str] = None) -> str:
+    if path is None:
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        path = os.path.join(Config.TRACE_DIR, f"run-{stamp}.json")
+
+        _prune_traces(Config.TRACE_DIR, Config.TRACE_KEEP - 1)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(to_chrome_trace(spans), file)
+
+    return path
+
+
+def _prune_traces(directory: str, keep: int) -> None:
+    """Delete all but the newest `keep` run-*.json files written by export_chrome_trace."""
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.startswith("run-") and name.endswith(".json"))
+    except FileNotFoundError:
+        return
+
+    for name in names[:max(len(names) - max(keep, 0), 0)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            pass
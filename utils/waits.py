@@ -0,0 +1,160 @@
+import hashlib
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, Optional
+from selenium.common import NoSuchElementException, StaleElementReferenceException, TimeoutException
+from components.ui_index import UISnapshot, UISnapshotCache
+from utils.config import Config
+from utils.tracing import traced
+
+IGNORED_EXCEPTIONS = (NoSuchElementException, StaleElementReferenceException)
+
+# Drivers whose screen an action changed without waiting for it to settle; see settle_screen()
+_unsettled = weakref.WeakKeyDictionary()
+
+
+class AdaptivePoller:
+    """Poll quickly at first and back off geometrically, so fast screens are noticed in tens of milliseconds."""
+
+    def __init__(self, minimum: float = None, maximum: float = None, factor: float = None):
+        self.interval = minimum or Config.WAIT_MIN_INTERVAL
+        self.maximum = maximum or Config.WAIT_MAX_INTERVAL
+        self.factor = factor or Config.WAIT_BACKOFF
+
+    def sleep(self, deadline: float) -> None:
+        time.sleep(max(0.0, min(self.interval, deadline - time.monotonic())))
+        self.interval = min(self.interval * self.factor, self.maximum)
+
+
+class LatencyBudget:
+    """Wall-clock allowance for one action; every wait inside the action is clamped to what is left."""
+
+    def __init__(self, seconds: Optional[float] = None):
+        self.seconds = seconds
+        self.started = time.monotonic()
+
+    @classmethod
+    def for_action(cls, action_name: str) -> "LatencyBudget":
+        return cls(Config.ACTION_BUDGETS.get(action_name))
+
+    def remaining(self) -> float:
+        if self.seconds is None:
+            return float("inf")
+
+        return max(0.0, self.seconds - (time.monotonic() - self.started))
+
+    def clamp(self, timeout: float) -> float:
+        return min(timeout, self.remaining())
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def exceeded(self) -> bool:
+        return self.seconds is not None and self.elapsed() > self.seconds
+
+
+@traced("wait.until", "wait")
+def wait_until(condition: Callable[[], Any], timeout: float, message: str = "",
+               ignored: Iterable[type] = IGNORED_EXCEPTIONS) -> Any:
+    """Return the first truthy value of condition(), polling adaptively; raise TimeoutException otherwise."""
+    deadline = time.monotonic() + timeout
+    poller = AdaptivePoller()
+    ignored = tuple(ignored)
+
+    while True:
+        try:
+            value = condition()
+            if value:
+                return value
+        except ignored:
+            pass
+
+        if time.monotonic() >= deadline:
+            raise TimeoutException(message or f"Condition not met within {timeout:.1f}s")
+
+        poller.sleep(deadline)
+
+
+class ConditionBatch:
+    """Several pending UI conditions answered from one page-source fetch per poll."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.conditions: Dict[str, Callable[[UISnapshot], Any]] = {}
+
+    def add(self, name: str, predicate: Callable[[UISnapshot], Any]) -> "ConditionBatch":
+        self.conditions[name] = predicate
+        return self
+
+    @traced("wait.conditions", "wait")
+    def wait(self, timeout: float, require_all: bool = True) -> Dict[str, Any]:
+        """Poll until every condition (or any, with require_all=False) holds; returns the satisfied ones."""
+        deadline = time.monotonic() + timeout
+        poller = AdaptivePoller()
+        pending = dict(self.conditions)
+        satisfied = {}
+
+        while True:
+            snapshot = UISnapshotCache.get(self.driver)
+            for name, predicate in list(pending.items()):
+                value = predicate(snapshot)
+                if value:
+                    satisfied[name] = value
+                    del pending[name]
+
+            if not pending or (satisfied and not require_all):
+                return satisfied
+
+            if time.monotonic() >= deadline:
+                raise TimeoutException(f"Timed out after {timeout:.1f}s waiting for: {', '.join(pending)}")
+
+            poller.sleep(deadline)
+            UISnapshotCache.invalidate(self.driver)
+
+
+def _source_signature(driver) -> bytes:
+    # A hash of the raw dump: comparing screens needs no parsing
+    return hashlib.blake2b(driver.page_source.encode("utf-8"), digest_size=16).digest()
+
+
+@traced("wait.stable_screen", "wait")
+def wait_for_stable_screen(driver, timeout: float = None) -> bool:
+    """Wait until two consecutive UI dumps are identical, i.e. the app has finished reacting.
+
+    Animated screens never settle, so callers pass what is left of their budget as `timeout`.
+    """
+    timeout = Config.WAIT_SETTLE_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    poller = AdaptivePoller()
+
+    try:
+        previous = _source_signature(driver)
+        while time.monotonic() < deadline:
+            poller.sleep(deadline)
+            current = _source_signature(driver)
+            if current == previous:
+                return True
+
+            previous = current
+
+        return False
+
+    finally:
+        UISnapshotCache.invalidate(driver)
+
+
+def mark_unsettled(driver) -> None:
+    """The last action changed the screen; the next step that needs it settled will wait for it."""
+    _unsettled[driver] = True
+
+
+def settle_screen(driver, timeout: float = None) -> bool:
+    """wait_for_stable_screen(), but only when an earlier action left the screen changing.
+
+    Steps that poll for their own elements (search, wait_for_screen) never need this; a screenshot does.
+    """
+    if _unsettled.pop(driver, None) is None:
+        return True
+
+    return wait_for_stable_screen(driver, timeout)